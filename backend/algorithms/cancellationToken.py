@@ -0,0 +1,35 @@
+import threading
+
+
+class SearchCancelled(Exception):
+    '''
+        Raised inside a search when its cancellation token is cancelled, in order to abandon the search at once
+    '''
+    pass
+
+
+class CancellationToken:
+    '''
+        Allows a search that runs in one thread to be stopped from another thread (for example, when the window closes).
+        The engines check the token every few nodes and raise SearchCancelled as soon as it is cancelled. A token 
+        cannot be reset, so every search that may need to be stopped gets a new one.
+
+        If an {event} is given (for example a multiprocessing.Event), the token is cancelled when it is set, so a search
+        in another process can be stopped too.
+    '''
+    def __init__(self, event = None):
+        self.__event = event if event is not None else threading.Event()
+
+
+    def cancel(self) -> None:
+        '''
+            Requests from the searches that use this token to stop
+        '''
+        self.__event.set()
+
+
+    def isCancelled(self) -> bool:
+        '''
+            Returns True if the token has been cancelled
+        '''
+        return self.__event.is_set()
@@ -1,6 +1,13 @@
 from components.state import State
+from components.boardMasks import BoardMasks, getBoardMasks
 from algorithms.utils import findOpponent
 
+# NumPy is only needed for evaluating many grids at once (see evaluateBatch), so the game runs without it
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 class ThreeTwoOneEvaluation:
     '''
         This class represents an evaluation method for the MiniMax algorithm. The method is based on the following formula:
@@ -15,16 +22,32 @@ class ThreeTwoOneEvaluation:
 
         Ally Symbols: All symbols on the grid that the player, who is currently playing, has placed
         Enemy Symbols: All symbols on the grid that the opponent has placed
+
+        On grids where a player needs k symbols in a row in order to win, the lines are all the segments of k cells, 
+        and the terms 3, 2, 1 stand for k, k - 1, k - 2 symbols. For the classic 3 X 3 grid (k = 3) this is exactly
+        the formula above.
     '''
-    def __init__(self, players: tuple[str, str]):
+    # The contribution of every possible line to the value, for every win length requested so far. A line contributes 
+    # only through the number of ally and enemy symbols it contains, so the tables are tiny ((k + 1) ^ 2 entries) and 
+    # they are shared by all the evaluation objects
+    __contributionTables: dict[int, list[int]] = {}
+
+    # For every (dimension, winLength), a (cells X lines) matrix of 0 and 1 that tells which cells every line contains.
+    # Used by evaluateBatch, in order to count the symbols of all the lines of many grids with a single product
+    __lineMatrices: dict[tuple[int, int], "numpy.ndarray"] = {}
+
+    def __init__(self, players: tuple[str, str], winLength: int = 3):
         self.__players = players
-        pass
+        self.__getContributionTable(winLength)
 
     def evaluate(self, state: State, currentPlayer: str) -> int:
         '''
             Evaluates the given state based on the following formula:
                 value = 10 * X3 + 3 * X2 + X1 - (10 * Y3 + 3 * Y2 + Y1)
 
+            Every line adds its own term to the value (for example +10 if it contains 3 ally and 0 enemy symbols),
+            so the value is the sum of one table lookup per line, using the symbol counters that the state keeps.
+
             Parameters:
                 state (State): A snapshot of the game that we want to evaluate, which means to determine
                     how much beneficial is for the player currently playing
@@ -33,304 +56,86 @@ class ThreeTwoOneEvaluation:
             Returns:
                 int: How much beneficial is for the player
         '''
-        X3: int = self.__calculateX3(state, currentPlayer)
-        X2: int = self.__calculateX2(state, currentPlayer)
-        X1: int = self.__calculateX1(state, currentPlayer)
-        Y3: int = self.__calculateY3(state, currentPlayer)
-        Y2: int = self.__calculateY2(state, currentPlayer)
-        Y1: int = self.__calculateY1(state, currentPlayer)
+        allyCounts: list[int] = state.getLineCounts(currentPlayer)
+        opponentCounts: list[int] = state.getLineCounts(findOpponent(currentPlayer, self.__players))
+        table: list[int] = self.__getContributionTable(state.winLength)
+        size: int = state.winLength + 1
 
-        return 10 * X3 + 3 * X2 + X1 - (10 * Y3 + 3 * Y2 + Y1)
-    
+        value: int = 0
+        for ally, opponent in zip(allyCounts, opponentCounts):
+            value += table[ally * size + opponent]
 
+        return value
     
-    def __calculateX3(self, state: State, currentPlayer: str) -> int:
-        '''
-            Calculates the number of rows, columns, diagonals that contain 3 symbols of the current player
-                and 0 symbols of the opponent
-
-            Returns:
-                int: The result (X3)
-        '''
-        opponent: str = findOpponent(currentPlayer, self.__players)
-        result: int = 0
-        for row in range(state.dimension):
-            if (self.__containsOnlyThreeAllySymbols(state.getRow(row), currentPlayer, opponent)):
-                result += 1
-
-        for column in range(state.dimension):
-            if (self.__containsOnlyThreeAllySymbols(state.getColumn(column), currentPlayer, opponent)):
-                result += 1
-
-        if (self.__containsOnlyThreeAllySymbols(state.getPrimaryDiagonal(), currentPlayer, opponent)):
-            result += 1
-
-        if (self.__containsOnlyThreeAllySymbols(state.getSecondaryDiagonal(), currentPlayer, opponent)):
-            result += 1
-
-        return result
-
-
-
-    def __calculateX2(self, state: State, currentPlayer: str) -> int:
-        '''
-            Calculates the number of rows, columns, diagonals that contain 2 symbols of the current player
-                and 0 symbols of the opponent
-
-            Returns:
-                int: The result (X2)
-        '''
-        opponent: str = findOpponent(currentPlayer, self.__players)
-        result: int = 0
-        for row in range(state.dimension):
-            if (self.__containsOnlyTwoAllySymbols(state.getRow(row), currentPlayer, opponent)):
-                result += 1
-
-        for column in range(state.dimension):
-            if (self.__containsOnlyTwoAllySymbols(state.getColumn(column), currentPlayer, opponent)):
-                result += 1
-
-        if (self.__containsOnlyTwoAllySymbols(state.getPrimaryDiagonal(), currentPlayer, opponent)):
-            result += 1
-
-        if (self.__containsOnlyTwoAllySymbols(state.getSecondaryDiagonal(), currentPlayer, opponent)):
-            result += 1
-
-        return result
-
 
-    def __calculateX1(self, state: State, currentPlayer: str) -> int:
+    def evaluateBatch(self, boards: "numpy.ndarray", currentPlayer: str, winLength: int | None = None) -> "numpy.ndarray":
         '''
-            Calculates the number of rows, columns, diagonals that contain 1 symbol of the current player
-                and 0 symbols of the opponent
-
-            Returns:
-                int: The result (X1)
-        '''
-        opponent: str = findOpponent(currentPlayer, self.__players)
-        result: int = 0
-        for row in range(state.dimension):
-            if (self.__containsOnlyOneAllySymbol(state.getRow(row), currentPlayer, opponent)):
-                result += 1
-
-        for column in range(state.dimension):
-            if (self.__containsOnlyOneAllySymbol(state.getColumn(column), currentPlayer, opponent)):
-                result += 1
-
-        if (self.__containsOnlyOneAllySymbol(state.getPrimaryDiagonal(), currentPlayer, opponent)):
-            result += 1
-
-        if (self.__containsOnlyOneAllySymbol(state.getSecondaryDiagonal(), currentPlayer, opponent)):
-            result += 1
-
-        return result
-    
-    
-    def __calculateY3(self, state: State, currentPlayer: str) -> int:
-        '''
-            Calculates the number of rows, columns, diagonals that contain 0 symbols of the current player
-                and 3 symbols of the opponent
-
-            Returns:
-                int: The result (Y2)
-        '''
-        opponent: str = findOpponent(currentPlayer, self.__players)
-        result: int = 0
-        for row in range(state.dimension):
-            if (self.__containsOnlyThreeOpponentSymbols(state.getRow(row), currentPlayer, opponent)):
-                result += 1
-
-        for column in range(state.dimension):
-            if (self.__containsOnlyThreeOpponentSymbols(state.getColumn(column), currentPlayer, opponent)):
-                result += 1
-
-        if (self.__containsOnlyThreeOpponentSymbols(state.getPrimaryDiagonal(), currentPlayer, opponent)):
-            result += 1
-
-        if (self.__containsOnlyThreeOpponentSymbols(state.getSecondaryDiagonal(), currentPlayer, opponent)):
-            result += 1
-
-        return result
-
-
-
-    def __calculateY2(self, state: State, currentPlayer: str) -> int:
-        '''
-            Calculates the number of rows, columns, diagonals that contain 0 symbols of the current player
-                and 2 symbols of the opponent
-
-            Returns:
-                int: The result (Y2)
-        '''
-        opponent: str = findOpponent(currentPlayer, self.__players)
-        result: int = 0
-        for row in range(state.dimension):
-            if (self.__containsOnlyTwoOpponentSymbols(state.getRow(row), currentPlayer, opponent)):
-                result += 1
-
-        for column in range(state.dimension):
-            if (self.__containsOnlyTwoOpponentSymbols(state.getColumn(column), currentPlayer, opponent)):
-                result += 1
+            Evaluates many grids at once, with the same formula as evaluate. The symbols of all the lines of all the 
+            grids are counted with one matrix product, and the contributions of the lines are looked up and summed 
+            with vectorized operations, so the cost per grid is much lower than calling evaluate for every state.
 
-        if (self.__containsOnlyTwoOpponentSymbols(state.getPrimaryDiagonal(), currentPlayer, opponent)):
-            result += 1
-
-        if (self.__containsOnlyTwoOpponentSymbols(state.getSecondaryDiagonal(), currentPlayer, opponent)):
-            result += 1
-
-        return result
-
-
-    def __calculateY1(self, state: State, currentPlayer: str) -> int:
-        '''
-            Calculates the number of rows, columns, diagonals that contain 0 symbols of the current player
-                and 1 symbol of the opponent
-
-            Returns:
-                int: The result (Y1)
-        '''
-        opponent: str = findOpponent(currentPlayer, self.__players)
-        result: int = 0
-        for row in range(state.dimension):
-            if (self.__containsOnlyOneOpponentSymbol(state.getRow(row), currentPlayer, opponent)):
-                result += 1
-
-        for column in range(state.dimension):
-            if (self.__containsOnlyOneOpponentSymbol(state.getColumn(column), currentPlayer, opponent)):
-                result += 1
-
-        if (self.__containsOnlyOneOpponentSymbol(state.getPrimaryDiagonal(), currentPlayer, opponent)):
-            result += 1
-
-        if (self.__containsOnlyOneOpponentSymbol(state.getSecondaryDiagonal(), currentPlayer, opponent)):
-            result += 1
-
-        return result
-
-    
-    def __containsOnlyThreeAllySymbols(self, symbols: list[str], currentPlayer: str, opponent: str) -> bool:
-        '''
-            Checks if the given list of {symbols} includes exactly 3 symbols of the {currentPlayer}
-                and 0 symbols of his {opponent}
-            
-            Parameters:
-                currentPlayer (str): The symbol of the player that currently plays
-                opponent (str): The symbol of the other player
-
-            Returns:
-                bool: True/False based on this condition
-        '''
-        totalAllySymbolAppearances = self.__calculateTotalAppearances(symbols, currentPlayer)
-        totalOpponentSymbolAppearances = self.__calculateTotalAppearances(symbols, opponent)
-
-        return totalAllySymbolAppearances == 3 and totalOpponentSymbolAppearances == 0
-    
-
-    def __containsOnlyTwoAllySymbols(self, symbols: list[str], currentPlayer: str, opponent: str) -> bool:
-        '''
-            Checks if the given list of {symbols} includes exactly 2 symbols of the {currentPlayer}
-                and 0 symbols of his {opponent}
-            
-            Parameters:
-                currentPlayer (str): The symbol of the player that currently plays
-                opponent (str): The symbol of the other player
-
-            Returns:
-                bool: True/False based on this condition
-        '''
-        totalAllySymbolAppearances = self.__calculateTotalAppearances(symbols, currentPlayer)
-        totalOpponentSymbolAppearances = self.__calculateTotalAppearances(symbols, opponent)
-
-        return totalAllySymbolAppearances == 2 and totalOpponentSymbolAppearances == 0
-
-
-    def __containsOnlyOneAllySymbol(self, symbols: list[str], currentPlayer: str, opponent: str) -> bool:
-        '''
-            Checks if the given list of {symbols} includes exactly 1 symbol of the {currentPlayer}
-                and 0 symbols of his {opponent}
-            
             Parameters:
-                currentPlayer (str): The symbol of the player that currently plays
-                opponent (str): The symbol of the other player
+                boards (numpy.ndarray): An (M, N, N) int8 array with M grids of N X N cells. A cell contains 1 for the 
+                    symbol of the first player, -1 for the symbol of the second player and 0 if it is empty
+                currentPlayer (str): the symbol of the player for whom the grids are evaluated
+                winLength (int | None): How many symbols in a row win the game. By default, as many as N
 
             Returns:
-                bool: True/False based on this condition
+                numpy.ndarray: The M values of the grids, in the same order
         '''
-        totalAllySymbolAppearances = self.__calculateTotalAppearances(symbols, currentPlayer)
-        totalOpponentSymbolAppearances = self.__calculateTotalAppearances(symbols, opponent)
+        if (numpy is None):
+            raise ImportError("NumPy is required in order to evaluate grids in batches")
 
-        return totalAllySymbolAppearances == 1 and totalOpponentSymbolAppearances == 0
-    
+        count, dimension = boards.shape[0], boards.shape[1]
+        winLength = winLength if winLength is not None else dimension
+        lineMatrix: numpy.ndarray = self.__getLineMatrix(dimension, winLength)
+        table: numpy.ndarray = numpy.asarray(self.__getContributionTable(winLength), dtype=numpy.int32)
 
-    def __containsOnlyThreeOpponentSymbols(self, symbols: list[str], currentPlayer: str, opponent: str) -> bool:
-        '''
-            Checks if the given list of {symbols} includes exactly 0 symbols of the {currentPlayer}
-                and 3 symbols of his {opponent}
-            
-            Parameters:
-                currentPlayer (str): The symbol of the player that currently plays
-                opponent (str): The symbol of the other player
+        cells: numpy.ndarray = boards.reshape(count, dimension * dimension)
+        allyCode: int = 1 if currentPlayer == self.__players[0] else -1
+        allyCounts: numpy.ndarray = (cells == allyCode).astype(numpy.int32) @ lineMatrix
+        opponentCounts: numpy.ndarray = (cells == -allyCode).astype(numpy.int32) @ lineMatrix
 
-            Returns:
-                bool: True/False based on this condition
-        '''
-        totalAllySymbolAppearances = self.__calculateTotalAppearances(symbols, currentPlayer)
-        totalOpponentSymbolAppearances = self.__calculateTotalAppearances(symbols, opponent)
+        return table[allyCounts * (winLength + 1) + opponentCounts].sum(axis=1)
 
-        return totalAllySymbolAppearances == 0 and totalOpponentSymbolAppearances == 3
-    
 
-    def __containsOnlyTwoOpponentSymbols(self, symbols: list[str], currentPlayer: str, opponent: str) -> bool:
+    def __getLineMatrix(self, dimension: int, winLength: int) -> "numpy.ndarray":
         '''
-            Checks if the given list of {symbols} includes exactly 0 symbols of the {currentPlayer}
-                and 2 symbols of his {opponent}
-            
-            Parameters:
-                currentPlayer (str): The symbol of the player that currently plays
-                opponent (str): The symbol of the other player
-
-            Returns:
-                bool: True/False based on this condition
+            Returns the matrix whose element [cell, line] is 1 if the {line} (see BoardMasks.lines) contains the {cell}.
+            The matrix is built the first time it is requested.
         '''
-        totalAllySymbolAppearances = self.__calculateTotalAppearances(symbols, currentPlayer)
-        totalOpponentSymbolAppearances = self.__calculateTotalAppearances(symbols, opponent)
+        lineMatrix: numpy.ndarray | None = ThreeTwoOneEvaluation.__lineMatrices.get((dimension, winLength))
+        if (lineMatrix is None):
+            masks: BoardMasks = getBoardMasks(dimension, winLength)
+            lineMatrix = numpy.zeros((masks.cellCount, len(masks.lines)), dtype=numpy.int32)
+            for line, mask in enumerate(masks.lines):
+                for cell in range(masks.cellCount):
+                    if (mask & (1 << cell)):
+                        lineMatrix[cell, line] = 1
 
-        return totalAllySymbolAppearances == 0 and totalOpponentSymbolAppearances == 2
+            ThreeTwoOneEvaluation.__lineMatrices[(dimension, winLength)] = lineMatrix
 
+        return lineMatrix
 
-    def __containsOnlyOneOpponentSymbol(self, symbols: list[str], currentPlayer: str, opponent) -> bool:
-        '''
-            Checks if the given list of {symbols} includes exactly 0 symbols of the {currentPlayer}
-                and 1 symbol of his {opponent}
-            
-            Parameters:
-                currentPlayer (str): The symbol of the player that currently plays
-                opponent (str): The symbol of the other player
 
-            Returns:
-                bool: True/False based on this condition
+    def __getContributionTable(self, winLength: int) -> list[int]:
         '''
-        totalAllySymbolAppearances = self.__calculateTotalAppearances(symbols, currentPlayer)
-        totalOpponentSymbolAppearances = self.__calculateTotalAppearances(symbols, opponent)
-
-        return totalAllySymbolAppearances == 0 and totalOpponentSymbolAppearances == 1
-    
-
-    def __calculateTotalAppearances(self, symbols: list[str], symbol: str) -> int:
+            Returns the table with the contribution of a line that contains {ally} and {opponent} symbols, at position 
+            ally * (winLength + 1) + opponent. The table is built the first time it is requested.
         '''
-            Calculates how many times the given {symbol} is appeared inside the {symbols} list
-
-            Parameters:
-                symbols (list[str]): A list containing symbols. It represents a row, a column or a diagonal
-                symbol (str): A character that a player uses or the ' '
+        table: list[int] | None = ThreeTwoOneEvaluation.__contributionTables.get(winLength)
+        if (table is None):
+            weights: dict[int, int] = {winLength: 10, winLength - 1: 3, winLength - 2: 1}
+            table = []
+            for ally in range(winLength + 1):
+                for opponent in range(winLength + 1):
+                    contribution: int = 0
+                    if (opponent == 0):
+                        contribution += weights.get(ally, 0)
+                    if (ally == 0):
+                        contribution -= weights.get(opponent, 0)
+                    table.append(contribution)
 
+            ThreeTwoOneEvaluation.__contributionTables[winLength] = table
 
-            Returns:
-                int: The result
-        '''
-        result: int = 0
-        for s in symbols:
-            if (s == symbol):
-                result += 1
-        
-        return result
\ No newline at end of file
+        return table
@@ -1,19 +1,183 @@
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, Future, wait
+
 #from backend.components.state import State
 from components.state import State
 from algorithms.evaluationMethods.threeTwoOneEvaluation import ThreeTwoOneEvaluation
-from algorithms.utils import findOpponent
+from algorithms.utils import findOpponent, playBestMove
+from algorithms.transpositionTable import TranspositionTable, TranspositionEntry, BoundType, ReplacementPolicy
+from algorithms.searchStatistics import SearchStatistics
+from algorithms.cancellationToken import CancellationToken, SearchCancelled
+from algorithms.tacticalCheck import TacticalCheck, TacticType
+from algorithms.moveOrdering import MoveOrdering
+from components.zobrist import getPlayerKey
+from components.boardMasks import BoardMasks, getBoardMasks
+
+# NumPy is only needed for the batch evaluation of the leaves (see MiniMax.__searchBatched), so the game runs without it
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INFINITY: int = 1000000 #larger than any value that an evaluation method can return
+
+
+class SearchTimeout(Exception):
+    '''
+        Raised inside the search when the deadline of the move has passed or the search has visited as many nodes as it
+        was allowed to, in order to abandon the unfinished iteration
+    '''
+    pass
+
+
+# The engine and the shared values of the prototype's moves, in a process that works for a parallel search 
+# (see MiniMax.__searchParallel). They are set once, when the process starts
+_workerEngine: "MiniMax | None" = None
+_workerRootValues = None #the value of every move of the prototype state, valid if its flag in _workerFinished is set
+_workerFinished = None
+_workerCancellation: "CancellationToken | None" = None #cancelled by the main process when its search is cancelled
+
+
+def initializeWorker(configuration: dict, rootValues, finished, cancelled) -> None:
+    '''
+        Runs once in every process of a parallel search. Creates the engine of the process with the given 
+        {configuration} (the arguments of MiniMax) and keeps the arrays that all the processes share, together with
+        the event that the main process sets in order to stop the searches of the processes
+    '''
+    global _workerEngine, _workerRootValues, _workerFinished, _workerCancellation
+    _workerEngine = MiniMax(**configuration)
+    _workerRootValues = rootValues
+    _workerFinished = finished
+    _workerCancellation = CancellationToken(cancelled)
+
+
+def searchRootMoveInWorker(state: "State", depth: int, player: str, move: tuple[int, int], index: int, 
+                           wallDeadline: float | None, maxNodes: int | None = None) -> tuple[int | None, list[tuple[int, int]], SearchStatistics]:
+    '''
+        Searches the {index}-th move of the prototype {state} in a process of a parallel search. The search starts
+        with alpha equal to the best value among the previous moves that have already finished (in any process), 
+        and then publishes its own value.
+
+        Returns:
+            tuple[int | None, list[tuple[int, int]], SearchStatistics]: The value of the move, the principal variation 
+                after it, and the statistics of its search. The value is None if the {wallDeadline} (see time.time)
+                passed, the search needed more than {maxNodes} nodes, or the main process cancelled the search
+    '''
+    alpha: int = -INFINITY
+    for previous in range(index):
+        if (_workerFinished[previous] and _workerRootValues[previous] > alpha):
+            alpha = _workerRootValues[previous]
+
+    deadline: float | None = None
+    if (wallDeadline is not None):
+        deadline = time.perf_counter() + (wallDeadline - time.time())
+
+    try:
+        result: tuple[int, list[tuple[int, int]], SearchStatistics] = _workerEngine.searchRootMove(state, depth, player, move, alpha, deadline,
+                                                                                                   maxNodes, _workerCancellation)
+    except (SearchTimeout, SearchCancelled):
+        return (None, [], _workerEngine.getStatistics())
+
+    _workerRootValues[index] = result[0]
+    _workerFinished[index] = 1
+    return result
+
 
 class MiniMax:
-    def __init__(self, playerA: str, playerB: str):
+    def __init__(self, playerA: str, playerB: str, alphaBeta: bool = False, transpositionTableSize: int = 0, 
+                 replacementPolicy: ReplacementPolicy = ReplacementPolicy.DEPTH_PREFERRED, useSymmetry: bool = False,
+                 moveDeadline: int | None = None, trackPrincipalVariation: bool = False, batchEvaluation: bool = False,
+                 parallelWorkers: int = 0, checkInterval: int = 64, tacticalCheck: bool = False,
+                 moveOrdering: bool = False):
         self.__players: tuple[str, str] = (playerA, playerB)
-        self.__childOptions: list[tuple[State, int]] = [] #it will save the direct children States of the State for which 
-        #the MiniMax algorithm will be called ("prototype" state), and their heuristic value
+        self.__bestMove: tuple[int, int] | None = None #the most beneficial move found so far in the "prototype" state,
+        #the state for which the MiniMax algorithm will be called
 
         self.__evaluationMethod: ThreeTwoOneEvaluation = ThreeTwoOneEvaluation(self.__players)
         self.__algorithmPlayer: str = " " #the player for which the algorithm was initially called
 
+        self.__alphaBeta: bool = alphaBeta #if True, the branches that cannot affect the minimax value are pruned
+        self.__visitedNodes: int = 0 #the number of states that the last search reviewed
+        self.__prunedNodes: int = 0 #the number of child states that the last search skipped due to alpha-beta pruning
+        self.__evaluatedLeaves: int = 0 #the number of states that the last search evaluated
+        self.__cacheHits: int = 0 #the number of states whose value the last search took from the transposition table
+        self.__cutoffs: int = 0 #the number of states whose remaining child states were pruned
+        self.__firstMoveCutoffs: int = 0 #the number of cutoffs that the first child state caused
+        self.__maximumDepth: int = 0 #the largest ply that the last search reached
+        self.__workerStatistics: SearchStatistics = SearchStatistics() #the sum of the statistics of the worker processes
+        self.__statistics: SearchStatistics = SearchStatistics() #the statistics of the last call of findBestMove
+
+        # Remembers the values of the reviewed states between the searches of the same game. It is disabled if its size is 0
+        self.__transpositionTable: TranspositionTable | None = None
+        if (transpositionTableSize > 0):
+            self.__transpositionTable = TranspositionTable(transpositionTableSize, replacementPolicy)
+
+        # If True, child-states that are rotations or reflections of a sibling are skipped (they have the same minimax
+        # value), and the transposition table is keyed on the canonical form of the states
+        self.__useSymmetry: bool = useSymmetry
+
+        # If it is set, the algorithm performs iterative deepening: it searches with depth 1, 2, 3 etc until the given 
+        # milliseconds pass, and returns the best state of the deepest search that finished
+        self.__moveDeadline: int | None = moveDeadline
+        self.__deadline: float | None = None #the time (in seconds, see time.perf_counter) that the current iteration must stop
+        self.__completedDepth: int = 0 #the depth of the deepest search that finished during the last call
+
+        # The number of nodes that the current call may visit (see findBestMove), and the number of visited nodes at
+        # which the current iteration must stop. None if there is no limit
+        self.__maxNodes: int | None = None
+        self.__nodeLimit: int | None = None
+        self.__nodeLimitReached: bool = False #True if the node limit interrupted a search during the last call
+
+        # Every {checkInterval} nodes, the search checks whether the deadline has passed or the cancellation token 
+        # of the current call (see findBestMove) has been cancelled
+        self.__checkInterval: int = checkInterval
+        self.__cancellationToken: CancellationToken | None = None
+
+        # If True, the algorithm also saves the sequence of moves that both players are expected to make
+        self.__trackPrincipalVariation: bool = trackPrincipalVariation
+        self.__principalVariations: list[list[tuple[int, int]]] = [] #the principal variation of the state at every ply
 
-    def miniMax(self, state: State, depth: int, player: str) -> State:
+        # If True, the leaves of every search are first collected and then evaluated all together with NumPy
+        # (see __searchBatched). Alpha-beta pruning and the transposition table are not used in this mode, since the
+        # values of the leaves are not known while the tree is walked
+        self.__batchEvaluation: bool = batchEvaluation
+        if (batchEvaluation and numpy is None):
+            raise ImportError("NumPy is required for the batch evaluation of the leaves")
+
+        # The tree of the current batched search. Node i has the (move, child node) pairs self.__nodeChildren[i], or
+        # None if it is a leaf, whose grid is self.__leafBoards[self.__nodeLeaves[i]]. Children always precede parents
+        self.__nodeChildren: list[list[tuple[tuple[int, int], int]] | None] = []
+        self.__nodeLeaves: list[int] = []
+        self.__nodeMaximize: list[bool] = []
+        self.__leafBoards: list[tuple[int, int]] = [] #the bitboards of the two players in every leaf
+        self.__knownNodes: dict[int, int] = {} #the node of every position (by zobrist hash) already collected
+
+        # If it is larger than 1, the moves of the prototype state are searched in parallel by that many processes
+        # (see __searchParallel). The processes are started by the first parallel search and live as long as the engine,
+        # so every move does not pay for starting them, and their transposition tables are kept from move to move.
+        # They are stopped by close
+        self.__parallelWorkers: int = parallelWorkers
+        self.__executor: ProcessPoolExecutor | None = None
+        self.__workersCancelled = None #the event that stops the searches of the processes (see initializeWorker)
+        self.__rootValues = None #the arrays that the processes of the parallel search share (see searchRootMoveInWorker)
+        self.__rootFinished = None
+        # If it is set, an immediate win, a forced block or a fork (see TacticalCheck) is played without a search
+        self.__tacticalCheck: TacticalCheck | None = TacticalCheck(self.__players) if tacticalCheck else None
+        self.__lastTactic: TacticType | None = None #the tactic of the move that the last call returned, if any
+
+        # If it is set, the moves of every state are sorted (see MoveOrdering) instead of being tried in row-major order,
+        # so alpha-beta pruning cuts off earlier. Among moves of equal value, the first one in that order is chosen
+        self.__moveOrdering: MoveOrdering | None = MoveOrdering() if moveOrdering else None
+
+        self.__configuration: dict = {
+            "playerA": playerA, "playerB": playerB, "alphaBeta": alphaBeta, "transpositionTableSize": transpositionTableSize,
+            "replacementPolicy": replacementPolicy, "useSymmetry": useSymmetry, "trackPrincipalVariation": trackPrincipalVariation,
+            "moveOrdering": moveOrdering
+        }
+
+
+    def miniMax(self, state: State, depth: int, player: str, maxNodes: int | None = None) -> State | None:
         '''
             Reviews the states that can occur from the given {state}, when the {player} makes his move.
             The most beneficial state for the {player} among these states is returned.
@@ -22,19 +186,150 @@ class MiniMax:
                 player (str): The symbol of the tic-tac-toe player who is currently playing
                 state (State): A snapshot of the tic-tac-toe game for which we want to determine the next best move 
                     the {player} can make
-                depth (int): A number that specifies how deep the algorithm will search the minimax tree
+                depth (int): A number that specifies how deep the algorithm will search the minimax tree. When a move 
+                    deadline is set, it is the maximum depth of the iterative deepening
+                maxNodes (int | None): The maximum number of states that the algorithm may review (see findBestMove)
+        '''
+        return playBestMove(self, state, depth, player, maxNodes)
+
+
+    def findBestMove(self, state: State, depth: int, player: str, cancellationToken: CancellationToken | None = None, 
+                     maxNodes: int | None = None) -> tuple[int, int, int] | None:
+        '''
+            Reviews the moves that the {player} can make in the given {state} and returns the most beneficial one.
+            If principal variation tracking is enabled, the expected sequence of moves can be read afterwards
+            with getPrincipalVariation(). If the {cancellationToken} is cancelled (from another thread), the search 
+            stops within a few nodes and SearchCancelled is raised.
+
+            If {maxNodes} is given, the algorithm performs iterative deepening (like with a move deadline) and stops as
+            soon as it has reviewed that many states, returning the best move of the deepest search that finished. The
+            search with depth 1 is never interrupted (it reviews one state per move), so there is always a move to return.
+            Unlike the deadline, the limit does not depend on the speed of the machine: the same call always does the
+            same work. The number of reviewed states is reported by getStatistics.
+
+            Parameters:
+                player (str): The symbol of the tic-tac-toe player who is currently playing
+                state (State): A snapshot of the tic-tac-toe game for which we want to determine the next best move 
+                    the {player} can make
+                depth (int): A number that specifies how deep the algorithm will search the minimax tree. When a move 
+                    deadline or {maxNodes} is set, it is the maximum depth of the iterative deepening
+
+            Returns:
+                tuple[int, int, int] | None: The (row, column) of the cell where the {player} should play, and the minimax
+                    value of the move. None if there is no move to make.
         '''
         self.__clearData()
+        startTime: float = time.perf_counter()
+        self.__cancellationToken = cancellationToken
+        self.__maxNodes = maxNodes
+
+        if (player != self.__algorithmPlayer):
+            # The stored values are evaluated for the previous algorithm player, so they are useless for the new one
+            self.clearTranspositionTable()
+
         self.__algorithmPlayer = player
-        minimaxValue: int = self.__execute(state, True, depth, player, True)
+        if (self.__transpositionTable is not None):
+            self.__transpositionTable.newSearch()
+        if (self.__moveOrdering is not None):
+            self.__moveOrdering.newSearch()
+
+        # The search makes and takes back the moves on a single copy of the state, so the given one is never changed
+        state = state.copy()
+
+        try:
+            if (self.__tacticalCheck is not None):
+                tacticalMove: tuple[int, int, TacticType] | None = self.__tacticalCheck.findTacticalMove(state, player)
+                if (tacticalMove is not None):
+                    return self.__playTacticalMove(state, player, tacticalMove)
 
-        # Find the state of the tic-tac-toe game that will occur if the {player} make his most benefical move
-        for option in self.__childOptions:
-            if (option[1] == minimaxValue):
-               return option[0]
+            if (self.__moveDeadline is None and maxNodes is None):
+                self.__completedDepth = depth
+                return self.__searchPrototype(state, depth, player)
 
+            return self.__iterativeDeepening(state, depth, player)
+        
+        finally:
+            self.__cancellationToken = None
+            self.__statistics = self.__collectStatistics(time.perf_counter() - startTime)
+            self.__maxNodes = None
     
-    def __execute(self, state: State, maximizePlayer: bool, depth: int, player: str, firstTime: bool) -> int:  
+
+    def __playTacticalMove(self, state: State, player: str, tacticalMove: tuple[int, int, TacticType]) -> tuple[int, int, int]:
+        '''
+            Returns the move that the tactical check found, with the value of the state it leads to, as if it were found 
+            by a search of depth 1
+        '''
+        row, column, self.__lastTactic = tacticalMove
+        state.makeMove(player, row, column)
+        value: int = self.__evaluationMethod.evaluate(state, player)
+        state.undoMove(row, column)
+
+        self.__visitedNodes = 1
+        self.__evaluatedLeaves = 1
+        self.__maximumDepth = 1
+        self.__completedDepth = 1
+        self.__principalVariations = [[(row, column)]]
+        return (row, column, value)
+
+
+    def __iterativeDeepening(self, state: State, maximumDepth: int, player: str) -> tuple[int, int, int] | None:
+        '''
+            Searches the given {state} with depth 1, 2, 3 etc until the {maximumDepth} is reached, the move deadline passes
+            or the node limit is reached. The search with depth 1 is never interrupted, so there is always a move to return.
+            A search deeper than the
+            number of empty cells gives the same result as a search as deep as the number of empty cells, so the 
+            iterations stop there.
+
+            Returns:
+                tuple[int, int, int] | None: The most beneficial move according to the deepest search that finished
+        '''
+        deadline: float | None = None
+        if (self.__moveDeadline is not None):
+            deadline = time.perf_counter() + self.__moveDeadline / 1000
+        maximumDepth = min(maximumDepth, len(state.getEmptyCellCoordinates()))
+        bestMove: tuple[int, int, int] | None = None
+        principalVariation: list[tuple[int, int]] = []
+
+        for depth in range(1, maximumDepth + 1):
+            self.__deadline = deadline if depth > 1 else None
+            self.__nodeLimit = self.__maxNodes if depth > 1 else None
+            try:
+                bestMove = self.__searchPrototype(state, depth, player)
+            except SearchTimeout:
+                break
+            finally:
+                self.__deadline = None
+                self.__nodeLimit = None
+
+            self.__completedDepth = depth
+            principalVariation = self.__principalVariations[0]
+
+        # The principal variation of an interrupted iteration is incomplete, so the one of the last finished iteration is kept
+        self.__principalVariations = [principalVariation]
+        return bestMove
+    
+
+    def __searchPrototype(self, state: State, depth: int, player: str) -> tuple[int, int, int] | None:
+        '''
+            Performs one search with the given {depth} and returns the most beneficial move in the prototype {state}
+        '''
+        self.__bestMove = None
+        self.__principalVariations = [[] for ply in range(depth + 2)]
+        if (self.__parallelWorkers > 1 and depth > 0 and not state.isVictory() and not state.gridIsFull()):
+            return self.__searchParallel(state, depth, player)
+
+        if (self.__batchEvaluation):
+            return self.__searchBatched(state, depth, player)
+
+        minimaxValue: int = self.__execute(state, True, depth, player, 0, -INFINITY, INFINITY)
+
+        if (self.__bestMove is None):
+            return None
+
+        return (self.__bestMove[0], self.__bestMove[1], minimaxValue)
+
+    
+    def __execute(self, state: State, maximizePlayer: bool, depth: int, player: str, ply: int, alpha: int, beta: int) -> int:  
         '''
             Recursive function that performs the MiniMax algorithm. If the state being reviewed is final, which means 
             some of the three conditions are fulfilled: \n
@@ -48,47 +343,597 @@ class MiniMax:
             If maximizePlayer is false, then the algorithm finds the minimum value of the child-states.
             This value is called minimax value for the given state, and is returned when function ends.
 
-            The algorithm saves the child-states of the "prototype" state (the state for which the algorithm run for first time)
-            and their minimax value so as to be used to determine the most beneficial next move, when the current state of the
-            tic-tac-toe game is the prototype state
+            The {ply} is the number of moves between the "prototype" state (the state for which the algorithm run for first time)
+            and the given {state}. For the prototype state, the algorithm saves the first move that achieves the minimax value,
+            which is the most beneficial next move. If principal variation tracking is enabled, every state also saves 
+            the sequence of moves that leads to its minimax value.
+
+            When alpha-beta pruning is enabled, {alpha} is the value that the maximizing player is already guaranteed 
+            and {beta} is the value that the minimizing player is already guaranteed. As soon as alpha >= beta, the rest
+            of the child-states cannot change the decision of the ancestors, so they are skipped. A child-state whose value
+            is not better than the bound of its parent may return a bound instead of its exact minimax value, but the first
+            child-state of the prototype state that achieves the minimax value is always searched with an open window, 
+            so the chosen move is the same as the one of the plain algorithm.
+
+            When the transposition table is enabled, a state that has already been searched at least {depth} levels deep 
+            returns its stored value (or narrows the alpha-beta window with it) instead of being searched again. The
+            prototype state is always searched, since the algorithm needs the values of its child-states.
         '''   
+        if (self.__nodeLimit is not None and self.__visitedNodes >= self.__nodeLimit):
+            self.__nodeLimitReached = True
+            raise SearchTimeout()
+
+        self.__visitedNodes += 1
+        if (self.__visitedNodes % self.__checkInterval == 0):
+            self.__checkLimits()
+
+        if (ply > self.__maximumDepth):
+            self.__maximumDepth = ply
+
+        # The game ends before any search deeper than the empty cells stops, so such a search gives the same value. 
+        # Stored with the smaller depth, the value is also reused by the deeper searches of the next moves
+        emptyCells: int = state.getEmptyCellCount()
+        depth = emptyCells if depth > emptyCells else depth
+
+        if (self.__trackPrincipalVariation):
+            self.__principalVariations[ply] = []
+
+        originalAlpha: int = alpha
+        originalBeta: int = beta
+        key: int | None = None
+        tableMove: tuple[int, int] | None = None #the best move of the state that the transposition table stored
+        if (self.__transpositionTable is not None):
+            key = self.__getPositionKey(state, player)
+            entry: TranspositionEntry | None = self.__transpositionTable.lookup(key)
+            if (entry is not None and entry.bestMove is not None):
+                tableMove = self.__fromTableMove(state, entry.bestMove)
+
+            if (entry is not None and entry.depth >= depth and ply > 0):
+                if (entry.boundType == BoundType.EXACT):
+                    self.__cacheHits += 1
+                    return entry.value
+                elif (entry.boundType == BoundType.LOWER):
+                    alpha = entry.value if entry.value > alpha else alpha
+                else:
+                    beta = entry.value if entry.value < beta else beta
+
+                if (alpha >= beta):
+                    self.__cacheHits += 1
+                    return entry.value
+
         if (depth == 0 or state.isVictory() or state.gridIsFull()):
-            return self.__evaluationMethod.evaluate(state, self.__algorithmPlayer)
+            self.__evaluatedLeaves += 1
+            value: int = self.__evaluationMethod.evaluate(state, self.__algorithmPlayer)
+            self.__storeValue(key, value, depth, originalAlpha, originalBeta)
+            return value
         
         opponent: str = findOpponent(player, self.__players)
-        childStates: list[State] = state.getChildStates(player)
+        moves: list[tuple[int, int]] = self.__getMoves(state, player)
+        if (self.__moveOrdering is not None):
+            if (ply == 0):
+                moves = self.__moveOrdering.orderRootMoves(state, moves)
+            else:
+                moves = self.__moveOrdering.orderMoves(state, moves, player, ply, tableMove)
+        bestMove: tuple[int, int] | None = None #the move that achieved the value of the state
 
         if (maximizePlayer):
-            value: int = -1000
+            value: int = -INFINITY
             childValue: int = 0
-            for child in childStates:
-                childValue = self.__execute(child, not maximizePlayer, depth - 1, opponent, False)
-                value = childValue if childValue > value else value
+            for index, move in enumerate(moves):
+                state.makeMove(player, move[0], move[1])
+                childValue = self.__execute(state, not maximizePlayer, depth - 1, opponent, ply + 1, alpha, beta)
+                state.undoMove(move[0], move[1])
+
+                if (childValue > value):
+                    value = childValue
+                    bestMove = move
+                    self.__saveBestMove(move, ply)
 
-                if (firstTime):
-                    # Save the child states of the initial state (prototype) and their heuristic value
-                    self.__childOptions.append((child, childValue))
+                if (self.__alphaBeta):
+                    alpha = value if value > alpha else alpha
+                    if (alpha >= beta):
+                        self.__recordCutoff(moves, index, player, ply, depth)
+                        break
 
         else:
-            value: int = 1000
+            value: int = INFINITY
             childValue: int = 0
-            for child in childStates:
-                childValue = self.__execute(child, not maximizePlayer, depth - 1, opponent, False)
-                value = childValue if childValue < value else value
+            for index, move in enumerate(moves):
+                state.makeMove(player, move[0], move[1])
+                childValue = self.__execute(state, not maximizePlayer, depth - 1, opponent, ply + 1, alpha, beta)
+                state.undoMove(move[0], move[1])
+
+                if (childValue < value):
+                    value = childValue
+                    bestMove = move
+                    self.__saveBestMove(move, ply)
 
-                if (firstTime):
-                    # Save the child states of the initial state (prototype) and their heuristic value
-                    self.__childOptions.append((child, childValue))
+                if (self.__alphaBeta):
+                    beta = value if value < beta else beta
+                    if (alpha >= beta):
+                        self.__recordCutoff(moves, index, player, ply, depth)
+                        break
 
 
+        if (key is not None and bestMove is not None):
+            bestMove = self.__toTableMove(state, bestMove)
+        self.__storeValue(key, value, depth, originalAlpha, originalBeta, bestMove)
         return value
     
 
+    def __recordCutoff(self, moves: list[tuple[int, int]], index: int, player: str, ply: int, depth: int) -> None:
+        '''
+            Counts the cutoff that the {index}-th of the {moves} of the {player} caused, in a state {ply} moves away from
+            the prototype state that was searched {depth} levels deep, and lets the move ordering learn from it
+        '''
+        self.__cutoffs += 1
+        self.__prunedNodes += len(moves) - index - 1
+        if (index == 0):
+            self.__firstMoveCutoffs += 1
+
+        if (self.__moveOrdering is not None):
+            self.__moveOrdering.recordCutoff(moves[index], player, ply, depth)
+    
+
+    def __searchParallel(self, state: State, depth: int, player: str) -> tuple[int, int, int] | None:
+        '''
+            Performs one search with the given {depth}, where every move of the prototype {state} is searched by one of 
+            the worker processes, and returns the most beneficial move.
+
+            With alpha-beta pruning, the processes share the values of the moves that have finished. The search of a 
+            move starts with alpha equal to the best finished value among the previous moves, which is never larger 
+            than the alpha of the serial algorithm for that move. So a move that the serial algorithm would choose 
+            gets its exact value, any other move gets a value that does not beat the previous ones, and the moves are 
+            compared in the same order as in the serial algorithm: the result is identical.
+        '''
+        moves: list[tuple[int, int]] = self.__getMoves(state, player)
+        if (self.__moveOrdering is not None):
+            moves = self.__moveOrdering.orderRootMoves(state, moves)
+        self.__startWorkers(state.dimension * state.dimension)
+        for index in range(len(moves)):
+            self.__rootFinished[index] = 0
+
+        wallDeadline: float | None = None
+        if (self.__deadline is not None):
+            wallDeadline = time.time() + (self.__deadline - time.perf_counter())
+
+        # Every move gets an equal share of the nodes that the search may still visit
+        nodeShare: int | None = None
+        if (self.__nodeLimit is not None):
+            nodeShare = (self.__nodeLimit - self.__visitedNodes - self.__workerStatistics.visitedNodes - 1) // len(moves)
+            if (nodeShare <= 0):
+                self.__nodeLimitReached = True
+                raise SearchTimeout()
+
+        self.__workersCancelled.clear()
+        futures: list[Future] = []
+        for index, move in enumerate(moves):
+            futures.append(self.__executor.submit(searchRootMoveInWorker, state, depth, player, move, index, wallDeadline, nodeShare))
+
+        # The processes cannot see the cancellation token, so it is checked while waiting for them. When it is cancelled,
+        # the processes are told to stop too, and the search waits for them, so none of them keeps searching afterwards
+        pendingFutures: set[Future] = set(futures)
+        while (len(pendingFutures) > 0):
+            pendingFutures = wait(pendingFutures, timeout=0.05)[1]
+            if (self.__cancellationToken is not None and self.__cancellationToken.isCancelled()):
+                self.__workersCancelled.set()
+                wait(pendingFutures)
+                for future in futures:
+                    self.__workerStatistics.add(future.result()[2])
+                raise SearchCancelled()
+
+        results: list[tuple[int | None, list[tuple[int, int]], SearchStatistics]] = [future.result() for future in futures]
+        self.__visitedNodes += 1
+        for _, _, statistics in results:
+            self.__workerStatistics.add(statistics)
+
+        if (any(childValue is None for childValue, _, _ in results)):
+            raise SearchTimeout()
+
+        value: int = -INFINITY
+        for move, (childValue, principalVariation, _) in zip(moves, results):
+            if (childValue > value):
+                value = childValue
+                self.__bestMove = move
+                self.__principalVariations[0] = [move] + principalVariation
+
+        return (self.__bestMove[0], self.__bestMove[1], value)
+    
+
+    def searchRootMove(self, state: State, depth: int, player: str, move: tuple[int, int], alpha: int, 
+                       deadline: float | None = None, maxNodes: int | None = None,
+                       cancellationToken: CancellationToken | None = None) -> tuple[int, list[tuple[int, int]], SearchStatistics]:
+        '''
+            Searches the state that occurs when the {player} makes the {move} in the prototype {state}, as the serial 
+            algorithm would search it with the given {alpha}. It is the work of a process of the parallel search, and it 
+            keeps the transposition table of the engine between the calls, just like findBestMove.
+
+            Parameters:
+                depth (int): The depth of the search of the prototype {state}
+                deadline (float | None): The time (see time.perf_counter) that the search must stop with SearchTimeout
+                maxNodes (int | None): The number of states after which the search must stop with SearchTimeout
+                cancellationToken (CancellationToken | None): Stops the search with SearchCancelled when it is cancelled
+
+            Returns:
+                tuple[int, list[tuple[int, int]], SearchStatistics]: The value of the {move}, the principal variation after 
+                    it (if it is tracked), and the statistics of the search
+        '''
+        self.__clearData()
+        if (player != self.__algorithmPlayer):
+            self.clearTranspositionTable()
+        self.__algorithmPlayer = player
+
+        state = state.copy()
+        state.makeMove(player, move[0], move[1])
+        self.__principalVariations = [[] for ply in range(depth + 2)]
+        self.__deadline = deadline
+        self.__nodeLimit = maxNodes
+        self.__cancellationToken = cancellationToken
+        startTime: float = time.perf_counter()
+        try:
+            value: int = self.__execute(state, False, depth - 1, findOpponent(player, self.__players), 1, alpha, INFINITY)
+        except (SearchTimeout, SearchCancelled):
+            # The statistics of the interrupted search are kept, so the caller can count the nodes that it visited
+            self.__statistics = self.__collectStatistics(time.perf_counter() - startTime)
+            raise
+        finally:
+            self.__deadline = None
+            self.__nodeLimit = None
+            self.__cancellationToken = None
+
+        return (value, self.__principalVariations[1], self.__collectStatistics(time.perf_counter() - startTime))
+
+
+    def __startWorkers(self, cellCount: int) -> None:
+        '''
+            Starts the processes of the parallel search, if they are not already running. The shared arrays have 
+            a position for every cell, which is enough for all the moves of the prototype state.
+        '''
+        if (self.__executor is not None and len(self.__rootValues) >= cellCount):
+            return
+
+        self.__stopWorkers()
+        self.__rootValues = multiprocessing.Array("i", cellCount)
+        self.__rootFinished = multiprocessing.Array("b", cellCount)
+        self.__workersCancelled = multiprocessing.Event()
+        self.__executor = ProcessPoolExecutor(self.__parallelWorkers, initializer=initializeWorker,
+                                              initargs=(self.__configuration, self.__rootValues, self.__rootFinished,
+                                                        self.__workersCancelled))
+
+
+    def close(self) -> None:
+        '''
+            Stops the processes of the parallel search, if they are running. It must be called when the engine is no
+            longer needed. A later parallel search starts them again.
+        '''
+        self.__stopWorkers()
+
+
+    def __stopWorkers(self) -> None:
+        '''
+            Stops the processes of the parallel search, if they are running. The moves that have not started are 
+            cancelled, and the ones that are running are told to stop, so the processes end within a few nodes.
+        '''
+        if (self.__executor is not None):
+            self.__workersCancelled.set()
+            self.__executor.shutdown(wait=True, cancel_futures=True)
+            self.__executor = None
+
+
+    def __searchBatched(self, state: State, depth: int, player: str) -> tuple[int, int, int] | None:
+        '''
+            Performs one search with the given {depth} in two passes, and returns the most beneficial move in the 
+            prototype {state}. The first pass walks the whole tree (see __collectNode) and writes down its shape and the
+            grids of its leaves, without evaluating them. Then all the leaves are evaluated with a single call of 
+            evaluateBatch, and the second pass backs the values up from the leaves to the prototype state, choosing 
+            the same moves as the plain algorithm.
+        '''
+        try:
+            root: int = self.__collectNode(state, depth, player, 0)
+            self.__evaluatedLeaves += len(self.__leafBoards)
+            leafValues: list[int] = self.__evaluateLeaves(state.dimension, state.winLength)
+
+            values: list[int] = [0] * len(self.__nodeChildren)
+            bestChildren: list[int] = [-1] * len(self.__nodeChildren) #the position (in the children) of the best move
+            for node, children in enumerate(self.__nodeChildren):
+                if (children is None):
+                    values[node] = leafValues[self.__nodeLeaves[node]]
+                    continue
+
+                maximizePlayer: bool = self.__nodeMaximize[node]
+                value: int = -INFINITY if maximizePlayer else INFINITY
+                for index, (move, child) in enumerate(children):
+                    if ((maximizePlayer and values[child] > value) or (not maximizePlayer and values[child] < value)):
+                        value = values[child]
+                        bestChildren[node] = index
+
+                values[node] = value
+
+            if (self.__nodeChildren[root] is None):
+                return None
+
+            # Follow the best moves from the prototype state, in order to find the best move and the principal variation
+            node: int = root
+            principalVariation: list[tuple[int, int]] = []
+            while (self.__nodeChildren[node] is not None):
+                move, child = self.__nodeChildren[node][bestChildren[node]]
+                principalVariation.append(move)
+                node = child
+
+            self.__bestMove = principalVariation[0]
+            if (self.__trackPrincipalVariation):
+                self.__principalVariations[0] = principalVariation
+
+            return (self.__bestMove[0], self.__bestMove[1], values[root])
+        
+        finally:
+            self.__nodeChildren = []
+            self.__nodeLeaves = []
+            self.__nodeMaximize = []
+            self.__leafBoards = []
+            self.__knownNodes = {}
+
+
+    def __collectNode(self, state: State, depth: int, player: str, ply: int) -> int:
+        '''
+            The first pass of the batched search. Adds the given {state} in the tree of the search, together with all the 
+            states below it up to the given {depth}, and returns its node. A state that is reached again through a 
+            different order of moves is the same position at the same depth, so its node is shared instead of walked again.
+        '''
+        if (self.__nodeLimit is not None and self.__visitedNodes >= self.__nodeLimit):
+            self.__nodeLimitReached = True
+            raise SearchTimeout()
+
+        self.__visitedNodes += 1
+        if (self.__visitedNodes % self.__checkInterval == 0):
+            self.__checkLimits()
+
+        if (ply > self.__maximumDepth):
+            self.__maximumDepth = ply
+
+        key: int = state.getZobristHash()
+        node: int | None = self.__knownNodes.get(key)
+        if (node is not None):
+            self.__cacheHits += 1
+            return node
+
+        children: list[tuple[tuple[int, int], int]] | None = None
+        leaf: int = -1
+        if (depth == 0 or state.isVictory() or state.gridIsFull()):
+            self.__leafBoards.append((state.getBitboard(self.__players[0]), state.getBitboard(self.__players[1])))
+            leaf = len(self.__leafBoards) - 1
+        else:
+            opponent: str = findOpponent(player, self.__players)
+            children = []
+            for move in self.__getMoves(state, player):
+                state.makeMove(player, move[0], move[1])
+                children.append((move, self.__collectNode(state, depth - 1, opponent, ply + 1)))
+                state.undoMove(move[0], move[1])
+
+        self.__nodeChildren.append(children)
+        self.__nodeLeaves.append(leaf)
+        self.__nodeMaximize.append(player == self.__algorithmPlayer)
+
+        node = len(self.__nodeChildren) - 1
+        self.__knownNodes[key] = node
+        return node
+    
+
+    def __evaluateLeaves(self, dimension: int, winLength: int) -> list[int]:
+        '''
+            Evaluates all the leaves that the first pass of the batched search collected, with a single call of 
+            evaluateBatch, and returns their values in the order they were collected
+        '''
+        shifts: numpy.ndarray = numpy.arange(dimension * dimension, dtype=numpy.uint64)
+        boardsA: numpy.ndarray = numpy.array([boards[0] for boards in self.__leafBoards], dtype=numpy.uint64)
+        boardsB: numpy.ndarray = numpy.array([boards[1] for boards in self.__leafBoards], dtype=numpy.uint64)
+
+        cellsA: numpy.ndarray = ((boardsA[:, None] >> shifts) & 1).astype(numpy.int8)
+        cellsB: numpy.ndarray = ((boardsB[:, None] >> shifts) & 1).astype(numpy.int8)
+        grids: numpy.ndarray = (cellsA - cellsB).reshape(len(self.__leafBoards), dimension, dimension)
+
+        return self.__evaluationMethod.evaluateBatch(grids, self.__algorithmPlayer, winLength).tolist()
+
+
+    def __checkLimits(self) -> None:
+        '''
+            Stops the search, raising SearchCancelled if the cancellation token has been cancelled, or SearchTimeout
+            if the deadline of the current iteration has passed
+        '''
+        if (self.__cancellationToken is not None and self.__cancellationToken.isCancelled()):
+            raise SearchCancelled()
+
+        if (self.__deadline is not None and time.perf_counter() >= self.__deadline):
+            raise SearchTimeout()
+
+
+    def __saveBestMove(self, move: tuple[int, int], ply: int) -> None:
+        '''
+            Called when the {move} is the best one found so far in a state {ply} moves away from the prototype state.
+            The move is saved if the state is the prototype, and it is prepended to the principal variation of its
+            child-state if principal variation tracking is enabled.
+        '''
+        if (ply == 0):
+            self.__bestMove = move
+
+        if (self.__trackPrincipalVariation):
+            self.__principalVariations[ply] = [move] + self.__principalVariations[ply + 1]
+    
+
+    def __getMoves(self, state: State, player: str) -> list[tuple[int, int]]:
+        '''
+            Returns the (row, column) moves that the {player} can make in the given {state}, in row-major order. If symmetry 
+            is used, only the first move of every group of moves that lead to symmetric child-states is kept, which is 
+            the one that the plain algorithm would choose among them.
+        '''
+        moves: list[tuple[int, int]] = state.getEmptyCellCoordinates()
+        if (not self.__useSymmetry):
+            return moves
+
+        result: list[tuple[int, int]] = []
+        canonicalForms: set[int] = set()
+        for move in moves:
+            state.makeMove(player, move[0], move[1])
+            canonicalForm: int = state.getCanonicalForm()
+            state.undoMove(move[0], move[1])
+
+            if (canonicalForm not in canonicalForms):
+                canonicalForms.add(canonicalForm)
+                result.append(move)
+
+        return result
+    
+
+    def __getPositionKey(self, state: State, player: str) -> int:
+        '''
+            Returns the key of the {state} in the transposition table, when the {player} plays next. If symmetry is used,
+            all the symmetric states share the same key: their canonical form itself, with the player in the lowest bit.
+            It is not hashed, since the canonical form of a 6 X 6 or larger grid has more bits than a hash, and two
+            different states would share an entry.
+        '''
+        if (self.__useSymmetry):
+            return (state.getCanonicalForm() << 1) | int(player == self.__players[1])
+        
+        return state.getZobristHash() ^ getPlayerKey(player)
+    
+
+    def __toTableMove(self, state: State, move: tuple[int, int]) -> tuple[int, int]:
+        '''
+            Returns the {move} of the given {state} as the transposition table stores it. If symmetry is used, the symmetric
+            states share the same entry, so the move is stored as it would be made in the canonical form of the {state}.
+        '''
+        if (not self.__useSymmetry):
+            return move
+
+        masks: BoardMasks = getBoardMasks(state.dimension, state.winLength)
+        return masks.coordinates[masks.symmetries[state.getCanonicalSymmetry()][move[0] * state.dimension + move[1]]]
+
+
+    def __fromTableMove(self, state: State, move: tuple[int, int]) -> tuple[int, int]:
+        '''
+            Returns the {move} that the transposition table stored for the given {state} as a move of the {state} itself
+            (see __toTableMove)
+        '''
+        if (not self.__useSymmetry):
+            return move
+
+        masks: BoardMasks = getBoardMasks(state.dimension, state.winLength)
+        return masks.coordinates[masks.inverseSymmetries[state.getCanonicalSymmetry()][move[0] * state.dimension + move[1]]]
+
+
+    def __storeValue(self, key: int | None, value: int, depth: int, alpha: int, beta: int, bestMove: tuple[int, int] | None = None) -> None:
+        '''
+            Saves the {value} of a state in the transposition table (if it is enabled). The {alpha} and {beta} are the
+            bounds of the state when its search started, and they determine whether the {value} is exact or just a bound.
+            The {bestMove} is the move that achieved the {value}, which the move ordering tries first the next time.
+        '''
+        if (key is None):
+            return
+
+        boundType: BoundType = BoundType.EXACT
+        if (value <= alpha):
+            boundType = BoundType.UPPER
+        elif (value >= beta):
+            boundType = BoundType.LOWER
+
+        self.__transpositionTable.store(key, value, depth, boundType, bestMove)
+    
+
     def __clearData(self) -> None:
         '''
             Resets the data that algorithm uses, back to their initial form
         '''
-        self.__childOptions = []
+        self.__bestMove = None
+        self.__principalVariations = []
+        self.__nodeLimitReached = False
+        self.__visitedNodes = 0
+        self.__prunedNodes = 0
+        self.__evaluatedLeaves = 0
+        self.__cacheHits = 0
+        self.__cutoffs = 0
+        self.__firstMoveCutoffs = 0
+        self.__maximumDepth = 0
+        self.__workerStatistics = SearchStatistics()
+        self.__completedDepth = 0
+        self.__lastTactic = None
+
+
+    def __collectStatistics(self, wallTime: float) -> SearchStatistics:
+        '''
+            Returns the statistics of the search that has just ended, which took {wallTime} seconds, together with the
+            statistics of the worker processes (if the search was parallel)
+        '''
+        statistics: SearchStatistics = SearchStatistics(self.__visitedNodes, self.__evaluatedLeaves, self.__cacheHits, self.__cutoffs,
+                                                        self.__prunedNodes, self.__maximumDepth, self.__completedDepth, wallTime,
+                                                        self.__firstMoveCutoffs, self.__nodeLimitReached)
+        statistics.add(self.__workerStatistics)
+        return statistics
+
+
+    def clearTranspositionTable(self) -> None:
+        '''
+            Forgets the values of all the states reviewed so far. It must be called when a new game starts.
+        '''
+        if (self.__transpositionTable is not None):
+            self.__transpositionTable.clear()
+
+
+    def clearMoveHistory(self) -> None:
+        '''
+            Forgets the history of the move ordering (see MoveOrdering), which is kept for the whole game. It must be 
+            called when a new game starts.
+        '''
+        if (self.__moveOrdering is not None):
+            self.__moveOrdering.clearHistory()
+
+
+    def getPrincipalVariation(self) -> list[tuple[int, int]]:
+        '''
+            Returns the (row, column) moves that both players are expected to make, starting with the move that the last
+            search returned. It is empty if principal variation tracking is disabled. The variation stops early where 
+            the search used a stored value of the transposition table.
+        '''
+        if (len(self.__principalVariations) == 0):
+            return []
+
+        return list(self.__principalVariations[0])
+
+
+    def getLastTactic(self) -> TacticType | None:
+        '''
+            Returns the tactic (win, block or fork) of the move that the last call returned, or None if the move was 
+            found by a search
+        '''
+        return self.__lastTactic
+
+
+    def getCompletedDepth(self) -> int:
+        '''
+            Returns the depth of the deepest search that finished during the last call of the algorithm
+        '''
+        return self.__completedDepth
+
+
+    def getStatistics(self) -> SearchStatistics:
+        '''
+            Returns the statistics (nodes, leaves, cache hits, cutoffs, depth and time) of the last call of findBestMove
+        '''
+        return self.__statistics
+
+
+    def getVisitedNodes(self) -> int:
+        '''
+            Returns the number of states that the last search reviewed
+        '''
+        return self.__statistics.visitedNodes
+    
+
+    def getPrunedNodes(self) -> int:
+        '''
+            Returns the number of child states (together with their whole subtrees) that the last search skipped 
+            due to alpha-beta pruning. It is always 0 when alpha-beta pruning is disabled.
+        '''
+        return self.__statistics.prunedNodes
 
 
 
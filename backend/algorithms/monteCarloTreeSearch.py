@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import math
+import random
+import time
+
+from components.state import State
+from algorithms.utils import findOpponent, playBestMove
+from algorithms.searchStatistics import SearchStatistics
+from algorithms.cancellationToken import CancellationToken, SearchCancelled
+
+
+class MonteCarloNode:
+    '''
+        A state of the tree of the Monte Carlo tree search. The node keeps how many playouts passed through it and
+        how many of them the {mover} (the player who made the {move} that led to the node) won. A draw counts as half a win.
+    '''
+    __slots__ = ("move", "mover", "parent", "children", "untriedMoves", "visits", "wins", "zobristHash", "terminal")
+
+    def __init__(self, move: tuple[int, int] | None, mover: str, parent: MonteCarloNode | None, state: State):
+        self.move: tuple[int, int] | None = move #None for the root
+        self.mover: str = mover
+        self.parent: MonteCarloNode | None = parent
+        self.children: list[MonteCarloNode] = []
+        self.terminal: bool = state.isVictory() or state.gridIsFull()
+        self.untriedMoves: list[tuple[int, int]] = [] if self.terminal else state.getEmptyCellCoordinates() #the moves without a child yet
+        self.visits: int = 0
+        self.wins: float = 0
+        self.zobristHash: int = state.getZobristHash() #identifies the node when the tree is reused on the next move
+
+
+class MonteCarloTreeSearch:
+    '''
+        An engine that chooses its moves with Monte Carlo tree search (UCT), instead of searching the whole tree of
+        the game like MiniMax. Every iteration walks down the tree choosing the child with the best upper confidence
+        bound, adds one new child, finishes the game from there with random moves (a playout) and counts the result
+        in all the nodes of the path. The move that was tried the most times is played.
+
+        The search stops after {iterations} iterations, or when the {moveDeadline} (in milliseconds) passes, or when the
+        node limit of the call is reached, whichever comes first. So on large grids, where the whole tree is out of reach,
+        a move is still returned in a fixed time.
+        If {reuseTree} is True, the part of the tree below the position of the next call is kept, so the playouts that
+        already went through it are not lost.
+    '''
+    def __init__(self, playerA: str, playerB: str, iterations: int | None = 10000, moveDeadline: int | None = None,
+                 explorationConstant: float = math.sqrt(2), reuseTree: bool = True, seed: int | None = None):
+        self.__players: tuple[str, str] = (playerA, playerB)
+        self.__iterations: int | None = iterations
+        self.__moveDeadline: int | None = moveDeadline
+        self.__explorationConstant: float = explorationConstant #how much the less tried moves are preferred
+        self.__reuseTree: bool = reuseTree
+        self.__random: random.Random = random.Random(seed)
+
+        self.__root: MonteCarloNode | None = None #the root of the last search
+        self.__completedIterations: int = 0 #the number of iterations of the last search
+        self.__reusedVisits: int = 0 #the number of playouts that the last search found in the reused tree
+        self.__maximumDepth: int = 0 #the largest number of moves between the root and a node that the last search added
+        self.__statistics: SearchStatistics = SearchStatistics() #the statistics of the last call of findBestMove
+
+
+    def miniMax(self, state: State, depth: int, player: str, maxNodes: int | None = None) -> State | None:
+        '''
+            Returns the state after the move that the playouts favor (see playBestMove). The {depth} is not used.
+        '''
+        return playBestMove(self, state, depth, player, maxNodes)
+
+
+    def findBestMove(self, state: State, depth: int, player: str, cancellationToken: CancellationToken | None = None, 
+                     maxNodes: int | None = None) -> tuple[int, int, int] | None:
+        '''
+            Searches the given {state} until the iterations or the deadline run out, and returns the move that was
+            tried the most times. Every iteration visits one new node, so {maxNodes} (if it is given) limits the
+            iterations of this call. At least one iteration is always made, whatever the iterations, the deadline or
+            the {maxNodes}. If the {cancellationToken} is cancelled (from another thread), the search stops after the
+            current iteration and SearchCancelled is raised.
+
+            Parameters:
+                player (str): The symbol of the tic-tac-toe player who is currently playing
+                state (State): A snapshot of the tic-tac-toe game for which we want to determine the next best move
+                depth (int): Accepted for the same signature as MiniMax.findBestMove, but it is not used
+
+            Returns:
+                tuple[int, int, int] | None: The (row, column) of the cell where the {player} should play, and the
+                    percentage of the playouts after the move that the {player} won (a draw counts as half a win).
+                    None if there is no move to make.
+        '''
+        startTime: float = time.perf_counter()
+        root: MonteCarloNode = self.__findRoot(state, player)
+        self.__completedIterations = 0
+        self.__maximumDepth = 0
+        if (root.terminal):
+            self.__root = None
+            self.__statistics = SearchStatistics()
+            return None
+
+        self.__root = root
+        self.__reusedVisits = root.visits
+
+        deadline: float | None = None
+        if (self.__moveDeadline is not None):
+            deadline = startTime + self.__moveDeadline / 1000
+
+        iterations: int | None = self.__iterations
+        if (maxNodes is not None):
+            iterations = maxNodes if iterations is None else min(iterations, maxNodes)
+        if (iterations is not None):
+            iterations = max(1, iterations)
+
+        # The iterations make and take back the moves on a single copy of the state. The first one is always made,
+        # even if the deadline has already passed, since the root has no child to return before it
+        state = state.copy()
+        while (iterations is None or self.__completedIterations < iterations):
+            if (self.__completedIterations > 0 and deadline is not None and time.perf_counter() >= deadline):
+                break
+            if (cancellationToken is not None and cancellationToken.isCancelled()):
+                raise SearchCancelled()
+
+            self.__iterate(root, state)
+            self.__completedIterations += 1
+
+        # Every iteration visits one new node and evaluates it with a playout. The playouts that the reused tree 
+        # already contained are counted as cache hits
+        self.__statistics = SearchStatistics(self.__completedIterations, self.__completedIterations, self.__reusedVisits,
+                                             maximumDepth=self.__maximumDepth, wallTime=time.perf_counter() - startTime,
+                                             nodeLimitReached=maxNodes is not None and self.__completedIterations >= maxNodes)
+
+        bestChild: MonteCarloNode | None = self.__getMostVisitedChild(root)
+        if (bestChild is None):
+            return None
+
+        return (bestChild.move[0], bestChild.move[1], round(100 * bestChild.wins / bestChild.visits))
+
+
+    def __findRoot(self, state: State, player: str) -> MonteCarloNode:
+        '''
+            Returns the node of the given {state} in the tree of the previous search (up to two moves below its root),
+            if the tree is reused and such a node exists. Otherwise, a new root is created.
+        '''
+        if (self.__reuseTree and self.__root is not None):
+            zobristHash: int = state.getZobristHash()
+            candidates: list[MonteCarloNode] = [self.__root]
+            for child in self.__root.children:
+                candidates.append(child)
+                candidates.extend(child.children)
+
+            for node in candidates:
+                if (node.zobristHash == zobristHash and node.mover != player):
+                    node.parent = None
+                    return node
+
+        return MonteCarloNode(None, findOpponent(player, self.__players), None, state)
+
+
+    def __iterate(self, root: MonteCarloNode, state: State) -> None:
+        '''
+            Performs one iteration of the search: selection, expansion, playout and backpropagation. The {state} is the
+            state of the {root}, and it is restored before returning.
+        '''
+        node: MonteCarloNode = root
+        path: list[tuple[int, int]] = []
+
+        # Selection: go down through the nodes whose moves have all been tried
+        while (not node.terminal and len(node.untriedMoves) == 0):
+            node = self.__selectChild(node)
+            state.makeMove(node.mover, node.move[0], node.move[1])
+            path.append(node.move)
+
+        # Expansion: add a child for one of the moves that have not been tried yet
+        if (not node.terminal):
+            move: tuple[int, int] = node.untriedMoves.pop(self.__random.randrange(len(node.untriedMoves)))
+            mover: str = findOpponent(node.mover, self.__players)
+            state.makeMove(mover, move[0], move[1])
+            path.append(move)
+
+            child: MonteCarloNode = MonteCarloNode(move, mover, node, state)
+            node.children.append(child)
+            node = child
+
+        if (len(path) > self.__maximumDepth):
+            self.__maximumDepth = len(path)
+
+        winner: str | None = self.__playout(state, node)
+
+        # Backpropagation: count the result in every node of the path, for the player who moved into the node
+        while (node is not None):
+            node.visits += 1
+            if (winner is None):
+                node.wins += 0.5
+            elif (winner == node.mover):
+                node.wins += 1
+            node = node.parent
+
+        for move in reversed(path):
+            state.undoMove(move[0], move[1])
+
+
+    def __selectChild(self, node: MonteCarloNode) -> MonteCarloNode:
+        '''
+            Returns the child of the {node} with the largest upper confidence bound: the rate of wins of the child, plus
+            a bonus that grows for the children that were tried fewer times than their siblings
+        '''
+        logarithm: float = math.log(node.visits)
+        bestChild: MonteCarloNode | None = None
+        bestBound: float = -1
+        for child in node.children:
+            bound: float = child.wins / child.visits + self.__explorationConstant * math.sqrt(logarithm / child.visits)
+            if (bound > bestBound):
+                bestBound = bound
+                bestChild = child
+
+        return bestChild
+
+
+    def __playout(self, state: State, node: MonteCarloNode) -> str | None:
+        '''
+            Finishes the game from the state of the {node} with random moves, and returns the symbol of the winner
+            (None for a draw). The {state} is restored before returning.
+        '''
+        if (state.isVictory()):
+            return node.mover
+
+        moves: list[tuple[int, int]] = state.getEmptyCellCoordinates()
+        self.__random.shuffle(moves)
+
+        winner: str | None = None
+        player: str = findOpponent(node.mover, self.__players)
+        played: int = 0
+        for move in moves:
+            state.makeMove(player, move[0], move[1])
+            played += 1
+            if (state.isVictory()):
+                winner = player
+                break
+            player = findOpponent(player, self.__players)
+
+        for move in moves[:played]:
+            state.undoMove(move[0], move[1])
+
+        return winner
+
+
+    def __getMostVisitedChild(self, node: MonteCarloNode) -> MonteCarloNode | None:
+        '''
+            Returns the child of the {node} that was tried the most times (the first one, if many are tried equally)
+        '''
+        bestChild: MonteCarloNode | None = None
+        for child in node.children:
+            if (bestChild is None or child.visits > bestChild.visits):
+                bestChild = child
+
+        return bestChild
+
+
+    def clearTree(self) -> None:
+        '''
+            Forgets the tree of the previous search. It must be called when a new game starts.
+        '''
+        self.__root = None
+
+
+    def getPrincipalVariation(self) -> list[tuple[int, int]]:
+        '''
+            Returns the (row, column) moves that both players are expected to make, starting with the move that the last
+            search returned, by following the most visited child of every node
+        '''
+        result: list[tuple[int, int]] = []
+        node: MonteCarloNode | None = self.__getMostVisitedChild(self.__root) if self.__root is not None else None
+        while (node is not None):
+            result.append(node.move)
+            node = self.__getMostVisitedChild(node)
+
+        return result
+
+
+    def getStatistics(self) -> SearchStatistics:
+        '''
+            Returns the statistics (iterations, reused playouts, depth and time) of the last call of findBestMove
+        '''
+        return self.__statistics
+
+
+    def getCompletedIterations(self) -> int:
+        '''
+            Returns the number of iterations (playouts) of the last search
+        '''
+        return self.__completedIterations
+
+
+    def getReusedVisits(self) -> int:
+        '''
+            Returns the number of playouts of previous searches that the last search found in the reused tree
+        '''
+        return self.__reusedVisits
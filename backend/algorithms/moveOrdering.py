@@ -0,0 +1,100 @@
+from components.state import State
+from components.boardMasks import BoardMasks, getBoardMasks
+
+
+class MoveOrdering:
+    '''
+        Sorts the moves of a state so that alpha-beta pruning finds a cutoff with the first move as often as possible.
+        The moves are tried in this order:
+        1) the best move that the transposition table stored for the state (found by a previous, shallower search),
+        2) the killer moves of the ply: the last {killerSlots} moves that caused a cutoff in another state of the same ply,
+        3) the remaining moves, by their history: how much the move (its cell, for the same player) caused cutoffs so
+            far, weighted by the square of the remaining depth, since cutoffs near the root save the most nodes,
+        4) ties are broken by the static prior of the cell: the number of lines that pass through it, which favors
+            the center and then the corners. Moves that are equal in all of the above keep their row-major order.
+        The moves of the prototype state are the exception: they are sorted by their static prior only (see orderRootMoves).
+
+        The killer moves are forgotten on every search, since the plies move by one with every move of the game, but
+        the history is kept for the whole game (see clearHistory).
+    '''
+    def __init__(self, killerSlots: int = 2):
+        self.__killerSlots: int = killerSlots
+        self.__killers: list[list[tuple[int, int]]] = [] #the killer moves of every ply, the most recent first
+        self.__history: dict[str, dict[tuple[int, int], int]] = {} #the history of every cell, for every player
+        self.__priors: dict[tuple[int, int], list[int]] = {} #the prior of every cell, by (dimension, winLength)
+
+
+    def orderMoves(self, state: State, moves: list[tuple[int, int]], player: str, ply: int,
+                   tableMove: tuple[int, int] | None = None) -> list[tuple[int, int]]:
+        '''
+            Returns the (row, column) {moves} of the {player} in the given {state}, {ply} moves away from the prototype
+            state, sorted from the most to the least promising. The {tableMove} is the best move that the transposition
+            table stored for the state, if any.
+        '''
+        priors: list[int] = self.__getPriors(state)
+        killers: list[tuple[int, int]] = self.__killers[ply] if ply < len(self.__killers) else []
+        history: dict[tuple[int, int], int] = self.__history.get(player, {})
+        dimension: int = state.dimension
+
+        def priority(move: tuple[int, int]) -> tuple[int, int, int, int]:
+            killerRank: int = len(killers) - killers.index(move) if move in killers else 0
+            return (move == tableMove, killerRank, history.get(move, 0), priors[move[0] * dimension + move[1]])
+
+        return sorted(moves, key=priority, reverse=True)
+
+
+    def orderRootMoves(self, state: State, moves: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        '''
+            Returns the (row, column) {moves} of the prototype {state}, sorted by the static prior of their cells. The
+            search keeps the first move that achieves the minimax value, so the order of the prototype state decides
+            between moves of equal value. It depends on nothing that the search learned, so the serial and the parallel
+            search (where every process has its own history) choose the same move.
+        '''
+        priors: list[int] = self.__getPriors(state)
+        dimension: int = state.dimension
+        return sorted(moves, key=lambda move: priors[move[0] * dimension + move[1]], reverse=True)
+
+
+    def recordCutoff(self, move: tuple[int, int], player: str, ply: int, depth: int) -> None:
+        '''
+            Called when the {move} of the {player} caused a cutoff in a state {ply} moves away from the prototype state,
+            which was searched {depth} levels deep
+        '''
+        while (len(self.__killers) <= ply):
+            self.__killers.append([])
+
+        killers: list[tuple[int, int]] = self.__killers[ply]
+        if (move in killers):
+            killers.remove(move)
+        killers.insert(0, move)
+        del killers[self.__killerSlots:]
+
+        history: dict[tuple[int, int], int] = self.__history.setdefault(player, {})
+        history[move] = history.get(move, 0) + depth * depth
+
+
+    def newSearch(self) -> None:
+        '''
+            Forgets the killer moves, before a new search
+        '''
+        self.__killers = []
+
+
+    def clearHistory(self) -> None:
+        '''
+            Forgets the killer moves and the history of all the cells. It must be called when a new game starts.
+        '''
+        self.__killers = []
+        self.__history = {}
+
+
+    def __getPriors(self, state: State) -> list[int]:
+        '''
+            Returns the number of lines that pass through every cell of the grid of the {state}
+        '''
+        key: tuple[int, int] = (state.dimension, state.winLength)
+        if (key not in self.__priors):
+            masks: BoardMasks = getBoardMasks(state.dimension, state.winLength)
+            self.__priors[key] = [len(lines) for lines in masks.cellLines]
+
+        return self.__priors[key]
@@ -0,0 +1,338 @@
+import time
+
+from components.state import State
+from algorithms.evaluationMethods.threeTwoOneEvaluation import ThreeTwoOneEvaluation
+from algorithms.utils import findOpponent, playBestMove
+from algorithms.transpositionTable import TranspositionTable, TranspositionEntry, BoundType, ReplacementPolicy
+from algorithms.searchStatistics import SearchStatistics
+from algorithms.cancellationToken import CancellationToken, SearchCancelled
+from algorithms.moveOrdering import MoveOrdering
+from algorithms.miniMax import INFINITY, SearchTimeout
+from components.zobrist import getPlayerKey
+
+
+class PrincipalVariationSearch:
+    '''
+        An engine that finds the same minimax values as MiniMax with alpha-beta pruning, but searches fewer states.
+        It is written in the negamax form: the value of a state is always calculated for the player who plays next,
+        so the value of a move is the negated value of the state it leads to, and one function serves both players.
+
+        Principal variation search: the first move of a state (the most promising one, see MoveOrdering) is searched
+        with the full alpha-beta window. Every other move is only tested with a null window (alpha, alpha + 1), which
+        cuts off much earlier and just answers whether the move is better than the first one. Only the moves that turn
+        out better are searched again with the full window.
+
+        Aspiration windows: the search deepens one level at a time (depth 1, 2, 3 etc), and every iteration starts with
+        a window of {aspirationWindow} around the value of the previous iteration, instead of the full window. If the
+        value falls outside of the window (fail low or fail high), the iteration is searched again with that side of
+        the window widened, doubling the margin every time.
+
+        If the {moveDeadline} (in milliseconds) is set, or a node limit is given to findBestMove, the deepening stops
+        when it is reached, and the move of the deepest iteration that finished is returned.
+    '''
+    def __init__(self, playerA: str, playerB: str, transpositionTableSize: int = 0,
+                 replacementPolicy: ReplacementPolicy = ReplacementPolicy.DEPTH_PREFERRED, moveDeadline: int | None = None,
+                 aspirationWindow: int = 8, checkInterval: int = 64):
+        self.__players: tuple[str, str] = (playerA, playerB)
+        self.__evaluationMethod: ThreeTwoOneEvaluation = ThreeTwoOneEvaluation(self.__players)
+        self.__moveOrdering: MoveOrdering = MoveOrdering()
+        self.__aspirationWindow: int = aspirationWindow
+
+        # Remembers the values of the reviewed states between the searches of the same game. It is disabled if its size is 0
+        self.__transpositionTable: TranspositionTable | None = None
+        if (transpositionTableSize > 0):
+            self.__transpositionTable = TranspositionTable(transpositionTableSize, replacementPolicy)
+
+        self.__moveDeadline: int | None = moveDeadline
+        self.__deadline: float | None = None #the time (see time.perf_counter) that the current iteration must stop
+        self.__checkInterval: int = checkInterval
+        self.__cancellationToken: CancellationToken | None = None
+        self.__nodeLimit: int | None = None #the number of visited nodes at which the current iteration must stop
+        self.__nodeLimitReached: bool = False #True if the node limit interrupted an iteration during the last call
+
+        self.__bestMove: tuple[int, int] | None = None #the best move of the prototype state in the current iteration
+        self.__principalVariations: list[list[tuple[int, int]]] = [] #the principal variation of the state at every ply
+        self.__completedDepth: int = 0 #the depth of the deepest iteration that finished during the last call
+
+        self.__visitedNodes: int = 0 #the number of states that the last call reviewed
+        self.__evaluatedLeaves: int = 0 #the number of states that the last call evaluated
+        self.__cacheHits: int = 0 #the number of states whose value the last call took from the transposition table
+        self.__cutoffs: int = 0 #the number of states whose remaining child states were pruned
+        self.__firstMoveCutoffs: int = 0 #the number of cutoffs that the first child state caused
+        self.__prunedNodes: int = 0 #the number of child states that the cutoffs skipped
+        self.__maximumDepth: int = 0 #the largest ply that the last call reached
+        self.__researches: int = 0 #the number of null-window tests and aspiration windows that had to be searched again
+        self.__statistics: SearchStatistics = SearchStatistics() #the statistics of the last call of findBestMove
+
+
+    def miniMax(self, state: State, depth: int, player: str, maxNodes: int | None = None) -> State | None:
+        '''
+            Returns the state after the move of the deepest finished iteration (see playBestMove)
+        '''
+        return playBestMove(self, state, depth, player, maxNodes)
+
+
+    def findBestMove(self, state: State, depth: int, player: str, cancellationToken: CancellationToken | None = None,
+                     maxNodes: int | None = None) -> tuple[int, int, int] | None:
+        '''
+            Searches the given {state} with depth 1, 2, 3 etc up to the given {depth} (or until the move deadline
+            passes, or {maxNodes} states have been reviewed) and returns the most beneficial move of the {player}. The
+            iteration with depth 1 is never interrupted, so there is always a move to return. If the {cancellationToken}
+            is cancelled (from another thread), the search stops within a few nodes and SearchCancelled is raised.
+
+            Returns:
+                tuple[int, int, int] | None: The (row, column) of the cell where the {player} should play, and the minimax
+                    value of the move for the {player}. None if there is no move to make.
+        '''
+        self.__clearData()
+        startTime: float = time.perf_counter()
+        self.__cancellationToken = cancellationToken
+        if (self.__transpositionTable is not None):
+            self.__transpositionTable.newSearch()
+        self.__moveOrdering.newSearch()
+
+        state = state.copy()
+        deadline: float | None = None
+        if (self.__moveDeadline is not None):
+            deadline = startTime + self.__moveDeadline / 1000
+
+        result: tuple[int, int, int] | None = None
+        principalVariation: list[tuple[int, int]] = []
+        try:
+            if (state.isVictory() or state.gridIsFull()):
+                return None
+
+            for iterationDepth in range(1, min(depth, state.getEmptyCellCount()) + 1):
+                self.__deadline = deadline if iterationDepth > 1 else None
+                self.__nodeLimit = maxNodes if iterationDepth > 1 else None
+                try:
+                    value: int = self.__searchIteration(state, iterationDepth, player, None if result is None else result[2])
+                except SearchTimeout:
+                    break
+                finally:
+                    self.__deadline = None
+                    self.__nodeLimit = None
+
+                result = (self.__bestMove[0], self.__bestMove[1], value)
+                principalVariation = self.__principalVariations[0]
+                self.__completedDepth = iterationDepth
+
+            return result
+
+        finally:
+            # The principal variation of an interrupted iteration is incomplete, so the one of the last finished iteration is kept
+            self.__principalVariations = [principalVariation]
+            self.__cancellationToken = None
+            self.__statistics = SearchStatistics(self.__visitedNodes, self.__evaluatedLeaves, self.__cacheHits, self.__cutoffs,
+                                                 self.__prunedNodes, self.__maximumDepth, self.__completedDepth,
+                                                 time.perf_counter() - startTime, self.__firstMoveCutoffs,
+                                                 self.__nodeLimitReached)
+
+
+    def __searchIteration(self, state: State, depth: int, player: str, previousValue: int | None) -> int:
+        '''
+            Searches the prototype {state} with the given {depth}, starting with an aspiration window around the
+            {previousValue} (the value of the previous iteration, None for the first one), and returns its value
+        '''
+        self.__principalVariations = [[] for ply in range(depth + 2)]
+        if (previousValue is None):
+            return self.__search(state, depth, player, 0, -INFINITY, INFINITY)
+
+        margin: int = self.__aspirationWindow
+        alpha: int = previousValue - margin
+        beta: int = previousValue + margin
+        while (True):
+            value: int = self.__search(state, depth, player, 0, alpha, beta)
+            if (value <= alpha):
+                alpha = max(-INFINITY, alpha - margin)
+            elif (value >= beta):
+                beta = min(INFINITY, beta + margin)
+            else:
+                return value
+
+            self.__researches += 1
+            margin *= 2
+            if (alpha == -INFINITY and beta == INFINITY):
+                return self.__search(state, depth, player, 0, alpha, beta)
+
+
+    def __search(self, state: State, depth: int, player: str, ply: int, alpha: int, beta: int) -> int:
+        '''
+            Returns the value of the {state} for the {player}, who plays next, when it is searched {depth} levels deep.
+            If the value is not larger than {alpha}, the returned value is an upper bound of it, and if it is not less
+            than {beta}, a lower bound (fail-soft). The {ply} is the number of moves from the prototype state.
+        '''
+        if (self.__nodeLimit is not None and self.__visitedNodes >= self.__nodeLimit):
+            self.__nodeLimitReached = True
+            raise SearchTimeout()
+
+        self.__visitedNodes += 1
+        if (self.__visitedNodes % self.__checkInterval == 0):
+            self.__checkLimits()
+
+        if (ply > self.__maximumDepth):
+            self.__maximumDepth = ply
+
+        emptyCells: int = state.getEmptyCellCount()
+        depth = emptyCells if depth > emptyCells else depth
+        self.__principalVariations[ply] = []
+
+        originalAlpha: int = alpha
+        originalBeta: int = beta
+        key: int | None = None
+        tableMove: tuple[int, int] | None = None
+        if (self.__transpositionTable is not None):
+            key = state.getZobristHash() ^ getPlayerKey(player)
+            entry: TranspositionEntry | None = self.__transpositionTable.lookup(key)
+            if (entry is not None):
+                tableMove = entry.bestMove
+                if (entry.depth >= depth and ply > 0):
+                    if (entry.boundType == BoundType.EXACT):
+                        self.__cacheHits += 1
+                        return entry.value
+                    elif (entry.boundType == BoundType.LOWER):
+                        alpha = entry.value if entry.value > alpha else alpha
+                    else:
+                        beta = entry.value if entry.value < beta else beta
+
+                    if (alpha >= beta):
+                        self.__cacheHits += 1
+                        return entry.value
+
+        if (depth == 0 or state.isVictory() or state.gridIsFull()):
+            self.__evaluatedLeaves += 1
+            value: int = self.__evaluationMethod.evaluate(state, player)
+            self.__storeValue(key, value, depth, originalAlpha, originalBeta, None)
+            return value
+
+        opponent: str = findOpponent(player, self.__players)
+        moves: list[tuple[int, int]] = self.__moveOrdering.orderMoves(state, state.getEmptyCellCoordinates(), player, ply, tableMove)
+        value: int = -INFINITY
+        bestMove: tuple[int, int] | None = None
+
+        for index, move in enumerate(moves):
+            state.makeMove(player, move[0], move[1])
+            if (index == 0):
+                childValue: int = -self.__search(state, depth - 1, opponent, ply + 1, -beta, -alpha)
+            else:
+                # A null window only tells whether the move is better than alpha. If it is, its exact value is needed
+                childValue = -self.__search(state, depth - 1, opponent, ply + 1, -alpha - 1, -alpha)
+                if (alpha < childValue < beta):
+                    self.__researches += 1
+                    childValue = -self.__search(state, depth - 1, opponent, ply + 1, -beta, -alpha)
+            state.undoMove(move[0], move[1])
+
+            if (childValue > value):
+                value = childValue
+                bestMove = move
+                if (ply == 0):
+                    self.__bestMove = move
+                self.__principalVariations[ply] = [move] + self.__principalVariations[ply + 1]
+
+            alpha = value if value > alpha else alpha
+            if (alpha >= beta):
+                self.__cutoffs += 1
+                self.__prunedNodes += len(moves) - index - 1
+                if (index == 0):
+                    self.__firstMoveCutoffs += 1
+                self.__moveOrdering.recordCutoff(move, player, ply, depth)
+                break
+
+        self.__storeValue(key, value, depth, originalAlpha, originalBeta, bestMove)
+        return value
+
+
+    def __storeValue(self, key: int | None, value: int, depth: int, alpha: int, beta: int, bestMove: tuple[int, int] | None) -> None:
+        '''
+            Saves the {value} of a state in the transposition table (if it is enabled). The {alpha} and {beta} are the
+            bounds of the state when its search started, and they determine whether the {value} is exact or just a bound.
+        '''
+        if (key is None):
+            return
+
+        boundType: BoundType = BoundType.EXACT
+        if (value <= alpha):
+            boundType = BoundType.UPPER
+        elif (value >= beta):
+            boundType = BoundType.LOWER
+
+        self.__transpositionTable.store(key, value, depth, boundType, bestMove)
+
+
+    def __checkLimits(self) -> None:
+        '''
+            Stops the search, raising SearchCancelled if the cancellation token has been cancelled, or SearchTimeout
+            if the deadline of the current iteration has passed
+        '''
+        if (self.__cancellationToken is not None and self.__cancellationToken.isCancelled()):
+            raise SearchCancelled()
+
+        if (self.__deadline is not None and time.perf_counter() >= self.__deadline):
+            raise SearchTimeout()
+
+
+    def __clearData(self) -> None:
+        '''
+            Resets the counters and the results of the previous call
+        '''
+        self.__bestMove = None
+        self.__principalVariations = []
+        self.__completedDepth = 0
+        self.__nodeLimitReached = False
+        self.__visitedNodes = 0
+        self.__evaluatedLeaves = 0
+        self.__cacheHits = 0
+        self.__cutoffs = 0
+        self.__firstMoveCutoffs = 0
+        self.__prunedNodes = 0
+        self.__maximumDepth = 0
+        self.__researches = 0
+
+
+    def clearTranspositionTable(self) -> None:
+        '''
+            Forgets the values of all the states reviewed so far. It must be called when a new game starts.
+        '''
+        if (self.__transpositionTable is not None):
+            self.__transpositionTable.clear()
+
+
+    def clearMoveHistory(self) -> None:
+        '''
+            Forgets the history of the move ordering (see MoveOrdering), which is kept for the whole game. It must be
+            called when a new game starts.
+        '''
+        self.__moveOrdering.clearHistory()
+
+
+    def getPrincipalVariation(self) -> list[tuple[int, int]]:
+        '''
+            Returns the (row, column) moves that both players are expected to make, according to the deepest iteration
+            that finished, starting with the move that the last call returned
+        '''
+        if (len(self.__principalVariations) == 0):
+            return []
+
+        return list(self.__principalVariations[0])
+
+
+    def getCompletedDepth(self) -> int:
+        '''
+            Returns the depth of the deepest iteration that finished during the last call
+        '''
+        return self.__completedDepth
+
+
+    def getResearches(self) -> int:
+        '''
+            Returns how many times the last call searched a state again, because a null window or an aspiration
+            window was wrong
+        '''
+        return self.__researches
+
+
+    def getStatistics(self) -> SearchStatistics:
+        '''
+            Returns the statistics (nodes, leaves, cache hits, cutoffs, depth and time) of the last call of findBestMove
+        '''
+        return self.__statistics
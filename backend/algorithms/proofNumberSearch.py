@@ -0,0 +1,402 @@
+import time
+from enum import Enum
+
+from components.state import State
+from algorithms.utils import findOpponent, playBestMove
+from algorithms.searchStatistics import SearchStatistics
+from algorithms.cancellationToken import CancellationToken, SearchCancelled
+from components.zobrist import getPlayerKey
+
+INFINITY: int = 100000000 #the proof (or disproof) number of a state that can never be proven (or disproven)
+
+
+class ProofResult(Enum):
+    '''
+        Proven: The attacker (the player to move in the prototype state) can force a win, whatever the opponent plays.
+        Disproven: The attacker cannot force a win. The game may still end in a tie, or in a win of the opponent.
+        Unknown: The node budget ran out before the state was proven or disproven.
+    '''
+    PROVEN = 1
+    DISPROVEN = 2
+    UNKNOWN = 3
+
+
+class ProofNumberTable:
+    '''
+        Stores the proof and disproof numbers of already reviewed states, in a fixed number of {capacity} slots.
+        The slot of a state is determined by its key, and when two keys fall in the same slot, the state whose
+        search cost more nodes (its work) is kept, since it is the more expensive one to search again. \n
+        The numbers are kept in parallel lists instead of entry objects, so a large table costs a few integers per slot.
+    '''
+    def __init__(self, capacity: int):
+        self.__capacity: int = max(1, capacity)
+        self.__keys: list[int | None] = []
+        self.__proofNumbers: list[int] = []
+        self.__disproofNumbers: list[int] = []
+        self.__work: list[int] = []
+        self.__size: int = 0 #the number of occupied slots
+
+        self.clear()
+
+
+    def lookup(self, key: int) -> tuple[int, int] | None:
+        '''
+            Returns the proof and disproof numbers that were stored with the given {key}, or None if there are no such numbers
+        '''
+        slot: int = key % self.__capacity
+        if (self.__keys[slot] != key):
+            return None
+
+        return (self.__proofNumbers[slot], self.__disproofNumbers[slot])
+
+
+    def store(self, key: int, proofNumber: int, disproofNumber: int, work: int) -> None:
+        '''
+            Saves the numbers of the state with the given {key}, unless its slot holds a different state whose search
+            cost more than the {work} (the nodes that the search of this state visited)
+        '''
+        slot: int = key % self.__capacity
+        current: int | None = self.__keys[slot]
+        if (current is not None and current != key and self.__work[slot] > work):
+            return
+
+        if (current is None):
+            self.__size += 1
+
+        self.__keys[slot] = key
+        self.__proofNumbers[slot] = proofNumber
+        self.__disproofNumbers[slot] = disproofNumber
+        self.__work[slot] = work
+
+
+    def clear(self) -> None:
+        '''
+            Removes all the entries of the table
+        '''
+        self.__keys = [None] * self.__capacity
+        self.__proofNumbers = [0] * self.__capacity
+        self.__disproofNumbers = [0] * self.__capacity
+        self.__work = [0] * self.__capacity
+        self.__size = 0
+
+
+    def getSize(self) -> int:
+        '''
+            Returns the number of entries that are currently stored
+        '''
+        return self.__size
+
+
+class ProofNumberSearch:
+    '''
+        An engine that answers whether the player to move can force a win, instead of estimating how good a state is
+        like MiniMax does. It uses depth-first proof-number search (df-pn): the proof number of a state is the minimum
+        number of leaves that must be won to prove that the attacker wins, and the disproof number is the minimum
+        number of leaves that must be drawn or lost to disprove it. The search always expands the most proving state,
+        so it goes deep along forced lines and ignores the quiet ones, which makes it able to solve tactical positions
+        on grids where a full-width search is out of reach.
+
+        Every proof stops after {nodeBudget} visited nodes with an unknown result (or earlier, when the node limit
+        given to findBestMove runs out). The numbers of the reviewed states
+        are kept in a table of {tableSize} slots (see ProofNumberTable), so the memory does not grow with the budget.
+        The table survives between the proofs of the same game, since the positions repeat from move to move.
+
+        As an engine (see findBestMove), it plays a forced win when it proves one, and otherwise the move of the
+        {fallback} engine (for example MiniMax), unless that move allows a forced win of the opponent.
+    '''
+    def __init__(self, playerA: str, playerB: str, nodeBudget: int = 100000, tableSize: int = 1000000,
+                 useSymmetry: bool = False, fallback = None, checkInterval: int = 64):
+        self.__players: tuple[str, str] = (playerA, playerB)
+        self.__nodeBudget: int = nodeBudget
+        self.__table: ProofNumberTable = ProofNumberTable(tableSize)
+
+        # If True, the states are stored by their canonical form, so rotations and reflections share their numbers
+        self.__useSymmetry: bool = useSymmetry
+        self.__fallback = fallback #an engine with the same findBestMove method, for example MiniMax
+        self.__fallbackSearched: bool = False #True if the fallback engine searched during the last call
+
+        self.__attacker: str = " " #the player who tries to force a win in the current proof
+        self.__attackerKey: int = 0 #mixed in the keys of the table, so the proofs of the two players do not collide
+        self.__proofNodes: int = 0 #the number of states that the current proof visited
+        self.__proofBudget: int = nodeBudget #the number of states that the current proof may visit
+        self.__maxNodes: int | None = None #the number of states that the current call may visit, with the fallback engine
+        self.__rootMoves: list[tuple[tuple[int, int], int, int]] = [] #every move of the prototype state with the numbers of its state
+
+        self.__checkInterval: int = checkInterval
+        self.__cancellationToken: CancellationToken | None = None
+
+        self.__visitedNodes: int = 0 #the number of states that the last call visited, in all of its proofs
+        self.__evaluatedLeaves: int = 0 #the number of states that ended the game
+        self.__cacheHits: int = 0 #the number of states whose numbers were taken from the table
+        self.__maximumDepth: int = 0 #the largest ply that the last call reached
+        self.__statistics: SearchStatistics = SearchStatistics() #the statistics of the last call of findBestMove or prove
+
+
+    def miniMax(self, state: State, depth: int, player: str, maxNodes: int | None = None) -> State | None:
+        '''
+            Returns the state after the proven win, or the move of the fallback engine (see playBestMove)
+        '''
+        return playBestMove(self, state, depth, player, maxNodes)
+
+
+    def findBestMove(self, state: State, depth: int, player: str, cancellationToken: CancellationToken | None = None,
+                     maxNodes: int | None = None) -> tuple[int, int, int] | None:
+        '''
+            Tries to prove that the {player} can force a win in the given {state}. If it can, the winning move is
+            returned. Otherwise the move of the fallback engine (searched with the given {depth}) is checked, and if
+            the opponent can force a win after it, a move that is not proven to lose is preferred.
+
+            If {maxNodes} is given, the proofs and the fallback engine share that many visited states: every proof
+            (and the search of the fallback engine) gets the nodes that are left, and a proof without nodes left has an
+            unknown result. The first proof visits at least the given {state}, and the fallback engine always finishes
+            its shallowest search, so a move is always returned (and the limit may be passed by that much).
+
+            Returns:
+                tuple[int, int, int] | None: The (row, column) of the cell where the {player} should play, and the value
+                    of the move: 1 for a proven win, -1 for a proven loss (every move loses) and 0 otherwise.
+                    None if there is no move to make.
+        '''
+        startTime: float = time.perf_counter()
+        self.__clearData(cancellationToken)
+        self.__maxNodes = maxNodes
+        if (state.isVictory() or state.gridIsFull()):
+            self.__statistics = self.__collectStatistics(time.perf_counter() - startTime)
+            return None
+
+        state = state.copy()
+        opponent: str = findOpponent(player, self.__players)
+        result: tuple[int, int, int] | None = None
+
+        if (self.__prove(state, player) == ProofResult.PROVEN):
+            for move, proofNumber, _ in self.__rootMoves:
+                if (proofNumber == 0):
+                    result = (move[0], move[1], 1)
+                    break
+
+        if (result is None):
+            moves: list[tuple[int, int]] = [move for move, _, _ in self.__rootMoves]
+            if (self.__fallback is not None):
+                fallbackNodes: int | None = None if maxNodes is None else max(1, maxNodes - self.__visitedNodes)
+                fallbackMove: tuple[int, int, int] | None = self.__fallback.findBestMove(state, depth, player, cancellationToken,
+                                                                                         fallbackNodes)
+                self.__fallbackSearched = True
+                if (fallbackMove is not None):
+                    moves.remove((fallbackMove[0], fallbackMove[1]))
+                    moves.insert(0, (fallbackMove[0], fallbackMove[1]))
+
+            # The first move (the one of the fallback engine, if there is one) after which the opponent cannot be
+            # proven to win. If every move loses, the first one is played
+            result = (moves[0][0], moves[0][1], -1)
+            for move in moves:
+                state.makeMove(player, move[0], move[1])
+                lost: bool = not state.gridIsFull() and self.__prove(state, opponent) == ProofResult.PROVEN
+                state.undoMove(move[0], move[1])
+                if (not lost):
+                    result = (move[0], move[1], 0)
+                    break
+
+        self.__statistics = self.__collectStatistics(time.perf_counter() - startTime)
+        self.__maxNodes = None
+        return result
+
+
+    def prove(self, state: State, player: str, cancellationToken: CancellationToken | None = None) -> ProofResult:
+        '''
+            Returns whether the {player}, who plays next in the given {state}, can force a win. If the node budget runs
+            out first, the result is unknown. If the {cancellationToken} is cancelled (from another thread), the proof
+            stops within a few nodes and SearchCancelled is raised.
+        '''
+        startTime: float = time.perf_counter()
+        self.__clearData(cancellationToken)
+        result: ProofResult = self.__prove(state.copy(), player)
+        self.__statistics = self.__collectStatistics(time.perf_counter() - startTime)
+        return result
+
+
+    def getWinningMove(self) -> tuple[int, int] | None:
+        '''
+            Returns the move of the prototype state that the last proof proved to win, or None if it did not prove a win
+        '''
+        for move, proofNumber, _ in self.__rootMoves:
+            if (proofNumber == 0):
+                return move
+
+        return None
+
+
+    def __prove(self, state: State, attacker: str) -> ProofResult:
+        '''
+            Runs a single proof for the {attacker}, who plays next in the given {state}, within the node budget
+        '''
+        self.__attacker = attacker
+        self.__attackerKey = getPlayerKey(attacker)
+        self.__proofNodes = 0
+        self.__rootMoves = []
+        self.__proofBudget = self.__nodeBudget
+        if (self.__maxNodes is not None):
+            usedNodes: int = self.__visitedNodes
+            if (self.__fallbackSearched):
+                usedNodes += self.__fallback.getStatistics().visitedNodes
+            # The first proof of a call always visits the prototype state, since its moves are needed
+            if (usedNodes > 0 and usedNodes >= self.__maxNodes):
+                return ProofResult.UNKNOWN
+            self.__proofBudget = max(1, min(self.__nodeBudget, self.__maxNodes - usedNodes))
+
+        proofNumber, disproofNumber = self.__search(state, True, INFINITY, INFINITY, 0)
+        if (proofNumber == 0):
+            return ProofResult.PROVEN
+        if (disproofNumber == 0):
+            return ProofResult.DISPROVEN
+
+        return ProofResult.UNKNOWN
+
+
+    def __search(self, state: State, attackerToMove: bool, proofThreshold: int, disproofThreshold: int, ply: int) -> tuple[int, int]:
+        '''
+            Searches the {state} (whose game has not ended) until its proof number reaches the {proofThreshold}, its
+            disproof number reaches the {disproofThreshold}, or the node budget runs out.
+
+            Parameters:
+                attackerToMove (bool): True if the attacker plays next in the {state} (an OR state, where one winning
+                    move proves it), False if the opponent of the attacker does (an AND state, where every move must win)
+                ply (int): The number of moves between the prototype state and the {state}
+
+            Returns:
+                tuple[int, int]: The proof and disproof numbers of the {state} when the search stopped
+        '''
+        self.__proofNodes += 1
+        self.__visitedNodes += 1
+        if (ply > self.__maximumDepth):
+            self.__maximumDepth = ply
+        if (self.__visitedNodes % self.__checkInterval == 0 and self.__cancellationToken is not None
+            and self.__cancellationToken.isCancelled()):
+            raise SearchCancelled()
+
+        startNodes: int = self.__proofNodes
+        player: str = self.__attacker if attackerToMove else findOpponent(self.__attacker, self.__players)
+        moves: list[tuple[int, int]] = state.getEmptyCellCoordinates()
+        proofNumbers: list[int] = []
+        disproofNumbers: list[int] = []
+
+        # The numbers of every child state: taken from the table, or from the end of the game, or 1 and 1 for a state
+        # that has not been reviewed yet. A move that wins decides the state at once, so the other moves are not needed
+        for (row, column) in moves:
+            state.makeMove(player, row, column)
+            if (state.isVictory()):
+                state.undoMove(row, column)
+                self.__evaluatedLeaves += 1
+                result: tuple[int, int] = (0, INFINITY) if attackerToMove else (INFINITY, 0)
+                if (ply == 0):
+                    self.__rootMoves = [((row, column), result[0], result[1])]
+                self.__table.store(self.__getPositionKey(state), result[0], result[1], 1)
+                return result
+            elif (state.gridIsFull()):
+                self.__evaluatedLeaves += 1
+                numbers: tuple[int, int] | None = (INFINITY, 0)
+            else:
+                numbers = self.__table.lookup(self.__getPositionKey(state))
+                if (numbers is None):
+                    numbers = (1, 1)
+                else:
+                    self.__cacheHits += 1
+            state.undoMove(row, column)
+
+            proofNumbers.append(numbers[0])
+            disproofNumbers.append(numbers[1])
+
+        # In an OR state the attacker chooses, so it is proven by its easiest child and disproven only by all of them.
+        # In an AND state it is the opposite. Swapping the numbers lets both cases be handled by the same loop
+        ownNumbers: list[int] = proofNumbers if attackerToMove else disproofNumbers
+        otherNumbers: list[int] = disproofNumbers if attackerToMove else proofNumbers
+        ownThreshold: int = proofThreshold if attackerToMove else disproofThreshold
+        otherThreshold: int = disproofThreshold if attackerToMove else proofThreshold
+
+        while (True):
+            best: int = 0
+            ownNumber: int = INFINITY #the smallest number among the children
+            secondNumber: int = INFINITY #the second smallest number among the children
+            otherNumber: int = 0
+            for index in range(len(moves)):
+                if (ownNumbers[index] < ownNumber):
+                    secondNumber = ownNumber
+                    ownNumber = ownNumbers[index]
+                    best = index
+                elif (ownNumbers[index] < secondNumber):
+                    secondNumber = ownNumbers[index]
+                otherNumber = min(INFINITY, otherNumber + otherNumbers[index])
+
+            if (ownNumber >= ownThreshold or otherNumber >= otherThreshold or self.__proofNodes >= self.__proofBudget):
+                break
+
+            # The best child is searched until it is no longer the best one (it becomes worse than the second child,
+            # by a margin of a quarter that avoids switching between two close children all the time), or until the
+            # state reaches its own thresholds
+            childOwnThreshold: int = min(ownThreshold, secondNumber + 1 + secondNumber // 4)
+            childOtherThreshold: int = otherThreshold - otherNumber + otherNumbers[best]
+            row, column = moves[best]
+            state.makeMove(player, row, column)
+            if (attackerToMove):
+                childNumbers: tuple[int, int] = self.__search(state, False, childOwnThreshold, childOtherThreshold, ply + 1)
+            else:
+                childNumbers = self.__search(state, True, childOtherThreshold, childOwnThreshold, ply + 1)
+            state.undoMove(row, column)
+
+            proofNumbers[best], disproofNumbers[best] = childNumbers
+
+        if (ply == 0):
+            self.__rootMoves = list(zip(moves, proofNumbers, disproofNumbers))
+
+        result = (ownNumber, otherNumber) if attackerToMove else (otherNumber, ownNumber)
+        self.__table.store(self.__getPositionKey(state), result[0], result[1], self.__proofNodes - startNodes)
+        return result
+
+
+    def __getPositionKey(self, state: State) -> int:
+        '''
+            Returns the key of the {state} in the table, for the attacker of the current proof
+        '''
+        if (self.__useSymmetry):
+            return state.getCanonicalForm() ^ self.__attackerKey
+
+        return state.getZobristHash() ^ self.__attackerKey
+
+
+    def __clearData(self, cancellationToken: CancellationToken | None) -> None:
+        '''
+            Resets the counters before a new call of findBestMove or prove
+        '''
+        self.__cancellationToken = cancellationToken
+        self.__fallbackSearched = False
+        self.__visitedNodes = 0
+        self.__evaluatedLeaves = 0
+        self.__cacheHits = 0
+        self.__maximumDepth = 0
+
+
+    def __collectStatistics(self, wallTime: float) -> SearchStatistics:
+        '''
+            Returns the statistics of the last call, which took {wallTime} seconds. The nodes of the fallback engine
+            are included, if it searched
+        '''
+        statistics: SearchStatistics = SearchStatistics(self.__visitedNodes, self.__evaluatedLeaves, self.__cacheHits,
+                                                        maximumDepth=self.__maximumDepth, wallTime=wallTime)
+        if (self.__fallbackSearched):
+            statistics.add(self.__fallback.getStatistics())
+        statistics.nodeLimitReached = self.__maxNodes is not None and statistics.visitedNodes >= self.__maxNodes
+
+        return statistics
+
+
+    def clearTable(self) -> None:
+        '''
+            Forgets the numbers of all the reviewed states. It must be called when a new game starts.
+        '''
+        self.__table.clear()
+
+
+    def getStatistics(self) -> SearchStatistics:
+        '''
+            Returns the statistics (nodes of all the proofs, finished games, table hits, depth and time) of the last call
+            of findBestMove or prove
+        '''
+        return self.__statistics
@@ -0,0 +1,322 @@
+'''
+    Solves small N X N grids where a player needs k symbols in a row, by labeling every reachable grid as a win, a draw
+    or a loss for the player to move, together with the number of moves until the game ends.
+
+    Run it from the backend folder:
+        python -m algorithms.retrogradeSolver <dimension> <winLength> [output folder]
+'''
+import bisect
+import contextlib
+import heapq
+import mmap
+import os
+import struct
+import sys
+import time
+
+from components.state import State
+
+WIN: int = 1
+DRAW: int = 0
+LOSS: int = -1
+
+RESULT_NAMES: dict[int, str] = {WIN: "win", DRAW: "draw", LOSS: "loss"}
+
+_positionFormat: struct.Struct = struct.Struct("<Q") #the canonical form of a grid
+_resultFormat: struct.Struct = struct.Struct("<QbB") #the canonical form, the result and the moves until the end
+
+# The canonical form has two bits per cell, so it fits in the 64 bits of the files up to 5 X 5 grids
+MAX_DIMENSION: int = 5
+
+
+def _findResult(results: mmap.mmap | None, code: int) -> tuple[int, int] | None:
+    '''
+        Returns the result and the moves until the end of the grid with the given canonical {code}, by a binary search in
+        the memory mapped (sorted) {results} of its layer. None if the grid is not there.
+    '''
+    if (results is None):
+        return None
+
+    size: int = _resultFormat.size
+    count: int = len(results) // size
+    index: int = bisect.bisect_left(range(count), code, key=lambda position: _positionFormat.unpack_from(results, position * size)[0])
+    if (index == count):
+        return None
+
+    foundCode, result, distance = _resultFormat.unpack_from(results, index * size)
+    return (result, distance) if foundCode == code else None
+
+
+class RetrogradeSolver:
+    '''
+        The grids are grouped in layers by the number of symbols they contain, so the player to move is known from the
+        layer (the first player starts) and every move leads to the next layer. Rotations and reflections of a grid have
+        the same result, so every grid is kept only once, by its canonical form (see State.getCanonicalForm).
+
+        The solver works in two passes over the layers, and no layer is ever kept whole in memory. Both passes stream
+        the files {chunkSize} grids at a time, so the memory is bounded by the chunks and not by the largest layer:
+        1) Forward: every layer is created from the file of the previous one. The grids of its moves are collected in
+            chunks, and every chunk is sorted, deduplicated and written as a run in the file "run_<layer>_<index>.bin".
+            The runs are merged (k-way merge of sorted files) into the file "positions_<layer>.bin", dropping the grids
+            that appear in more than one run, and then deleted.
+        2) Backward: the layers are solved from the last one to the first one. A grid that is won by the player who has
+            just moved is a loss, a full grid is a draw, and any other grid takes the best result among its moves, whose
+            grids belong to the layer that was solved just before. They are found with a binary search in the memory
+            mapped file of that layer, so the operating system pages its results in and out as needed. The results are
+            streamed in the file "results_<layer>.bin", in the same (sorted) order.
+
+        A win is reached as fast as possible, a loss as late as possible, and a draw as fast as possible.
+    '''
+    def __init__(self, dimension: int, winLength: int, outputFolder: str, players: tuple[str, str] = ("X", "O"),
+                 chunkSize: int = 100000, reportProgress: bool = True):
+        if (dimension < 1 or dimension > MAX_DIMENSION):
+            raise ValueError(f"The retrograde solver supports grids from 1 X 1 up to {MAX_DIMENSION} X {MAX_DIMENSION}, "
+                             f"since the canonical forms are stored in 64 bits (got {dimension} X {dimension})")
+
+        self.__dimension: int = dimension
+        self.__winLength: int = winLength
+        self.__outputFolder: str = outputFolder
+        self.__players: tuple[str, str] = players
+        self.__chunkSize: int = chunkSize
+        self.__reportProgress: bool = reportProgress
+
+        self.__cellCount: int = dimension * dimension
+        self.__full: int = (1 << self.__cellCount) - 1
+        self.__layerSizes: list[int] = [] #the number of grids of every layer, after the forward pass
+
+
+    def solve(self) -> tuple[int, int]:
+        '''
+            Runs both passes and returns the result and the moves until the end of the empty grid
+        '''
+        os.makedirs(self.__outputFolder, exist_ok=True)
+        self.__forwardPass()
+        self.__backwardPass()
+
+        return self.getResult(State(self.__dimension, self.__players, self.__winLength))
+
+
+    def __forwardPass(self) -> None:
+        '''
+            Creates all the layers, from the empty grid up to the full grids, and writes them in the files of the positions
+        '''
+        state: State = State(self.__dimension, self.__players, self.__winLength)
+        with open(self.__getPath("positions", 0), "wb") as file:
+            file.write(_positionFormat.pack(state.getCanonicalForm()))
+        self.__layerSizes = [1]
+
+        for symbols in range(self.__cellCount):
+            start: float = time.perf_counter()
+            player: str = self.__players[symbols % 2]
+            runPaths: list[str] = []
+            children: list[int] = []
+
+            for chunk in self.__readChunks(self.__getPath("positions", symbols)):
+                for code in chunk:
+                    self.__assignCode(state, code)
+                    if (state.isVictory()):
+                        continue
+
+                    for (row, column) in state.getEmptyCellCoordinates():
+                        state.makeMove(player, row, column)
+                        children.append(state.getCanonicalForm())
+                        state.undoMove(row, column)
+
+                    if (len(children) >= self.__chunkSize):
+                        runPaths.append(self.__writeRun(symbols + 1, len(runPaths), children))
+                        children = []
+
+            if (len(children) > 0):
+                runPaths.append(self.__writeRun(symbols + 1, len(runPaths), children))
+
+            self.__layerSizes.append(self.__mergeRuns(runPaths, self.__getPath("positions", symbols + 1)))
+            self.__report("forward", symbols, self.__layerSizes[symbols], time.perf_counter() - start)
+
+
+    def __writeRun(self, symbols: int, index: int, codes: list[int]) -> str:
+        '''
+            Sorts the {codes} (of the layer with {symbols} symbols), drops the duplicates and writes them in a new run file.
+            Returns the path of the file.
+        '''
+        path: str = self.__getPath(f"run_{symbols}", index)
+        with open(path, "wb") as file:
+            file.write(b"".join(_positionFormat.pack(code) for code in sorted(set(codes))))
+
+        return path
+
+
+    def __mergeRuns(self, runPaths: list[str], path: str) -> int:
+        '''
+            Merges the sorted run files at the {runPaths} into the file at the given {path}, keeping every code once, and
+            deletes the runs. Returns the number of codes that were written.
+        '''
+        # The runs share the memory of one chunk between them
+        records: int = max(1, self.__chunkSize // max(1, len(runPaths)))
+        runs = [self.__readCodes(runPath, records) for runPath in runPaths]
+        count: int = 0
+        previous: int | None = None
+        output: list[int] = []
+
+        with open(path, "wb") as file:
+            for code in heapq.merge(*runs):
+                if (code == previous):
+                    continue
+
+                previous = code
+                output.append(code)
+                if (len(output) == self.__chunkSize):
+                    file.write(b"".join(_positionFormat.pack(outputCode) for outputCode in output))
+                    count += len(output)
+                    output = []
+
+            file.write(b"".join(_positionFormat.pack(outputCode) for outputCode in output))
+            count += len(output)
+
+        for runPath in runPaths:
+            os.remove(runPath)
+
+        return count
+
+
+    def __backwardPass(self) -> None:
+        '''
+            Solves the layers from the full grids back to the empty grid, and writes them in the files of the results
+        '''
+        state: State = State(self.__dimension, self.__players, self.__winLength)
+
+        for symbols in range(self.__cellCount, -1, -1):
+            start: float = time.perf_counter()
+            player: str = self.__players[symbols % 2]
+            count: int = 0
+
+            with open(self.__getPath("results", symbols), "wb") as resultFile:
+                with self.__mapResults(symbols + 1) as nextResults:
+                    for chunk in self.__readChunks(self.__getPath("positions", symbols)):
+                        output: bytearray = bytearray()
+                        for code in chunk:
+                            self.__assignCode(state, code)
+                            result, distance = self.__solvePosition(state, player, nextResults)
+                            output += _resultFormat.pack(code, result, distance)
+
+                        resultFile.write(output)
+                        count += len(chunk)
+
+            self.__report("backward", symbols, count, time.perf_counter() - start)
+
+
+    def __solvePosition(self, state: State, player: str, nextResults: mmap.mmap | None) -> tuple[int, int]:
+        '''
+            Returns the result and the moves until the end of the {state} for the {player}, using the memory mapped
+            results of the next layer (None if that layer has no grids)
+        '''
+        if (state.isVictory()):
+            return (LOSS, 0)
+        if (state.gridIsFull()):
+            return (DRAW, 0)
+
+        bestResult: int = LOSS - 1
+        bestDistance: int = 0
+        for (row, column) in state.getEmptyCellCoordinates():
+            state.makeMove(player, row, column)
+            childResult, childDistance = _findResult(nextResults, state.getCanonicalForm())
+            state.undoMove(row, column)
+
+            # The result of the child is for the opponent
+            result: int = -childResult
+            distance: int = childDistance + 1
+            if (result > bestResult or (result == bestResult and (distance > bestDistance if result == LOSS else distance < bestDistance))):
+                bestResult = result
+                bestDistance = distance
+
+        return (bestResult, bestDistance)
+
+
+    def getResult(self, state: State) -> tuple[int, int] | None:
+        '''
+            Returns the result (WIN, DRAW or LOSS for the player to move) and the moves until the end of the {state}, by
+            searching the file of its layer. None if the state cannot occur in a game.
+        '''
+        symbols: int = self.__cellCount - state.getEmptyCellCount()
+
+        with self.__mapResults(symbols) as results:
+            return _findResult(results, state.getCanonicalForm())
+
+
+    def getLayerSizes(self) -> list[int]:
+        '''
+            Returns the number of grids (up to rotations and reflections) with 0, 1, 2 etc symbols
+        '''
+        return list(self.__layerSizes)
+
+
+    def __assignCode(self, state: State, code: int) -> None:
+        '''
+            Writes in the {state} the grid of the given canonical form
+        '''
+        state.assignBitboards(code & self.__full, code >> self.__cellCount)
+
+
+    @contextlib.contextmanager
+    def __mapResults(self, symbols: int):
+        '''
+            Maps the file of the results of the layer with {symbols} symbols in memory, and yields it. Yields None if the
+            layer does not exist or has no grids (an empty file cannot be mapped).
+        '''
+        path: str = self.__getPath("results", symbols)
+        if (not os.path.exists(path) or os.path.getsize(path) == 0):
+            yield None
+            return
+
+        with open(path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as results:
+                yield results
+
+
+    def __readChunks(self, path: str, records: int | None = None):
+        '''
+            Yields the codes of the file at the given {path}, {records} records at a time ({chunkSize} if not given)
+        '''
+        with open(path, "rb") as file:
+            while (True):
+                data: bytes = file.read((records or self.__chunkSize) * _positionFormat.size)
+                if (len(data) == 0):
+                    return
+
+                yield [code for (code,) in _positionFormat.iter_unpack(data)]
+
+
+    def __readCodes(self, path: str, records: int):
+        '''
+            Yields the codes of the file at the given {path} one by one, reading {records} records at a time
+        '''
+        for chunk in self.__readChunks(path, records):
+            yield from chunk
+
+
+    def __getPath(self, kind: str, symbols: int) -> str:
+        '''
+            Returns the path of the file of the given {kind} ("positions" or "results") for the layer with {symbols}
+            symbols. For a run of the forward pass, the {kind} names the layer and {symbols} is the index of the run.
+        '''
+        return os.path.join(self.__outputFolder, f"{kind}_{symbols}.bin")
+
+
+    def __report(self, passName: str, symbols: int, count: int, seconds: float) -> None:
+        '''
+            Prints the progress of a pass, if progress reporting is enabled
+        '''
+        if (self.__reportProgress):
+            rate: float = count / seconds if seconds > 0 else 0
+            print(f"{passName} pass, layer {symbols:2}: {count:9} grids in {seconds:7.2f} s ({rate:9.0f} grids/s)")
+
+
+if (__name__ == "__main__"):
+    dimension: int = int(sys.argv[1])
+    winLength: int = int(sys.argv[2])
+    outputFolder: str = sys.argv[3] if len(sys.argv) > 3 else os.path.join("data", f"retrograde{dimension}x{dimension}k{winLength}")
+
+    start: float = time.perf_counter()
+    solver: RetrogradeSolver = RetrogradeSolver(dimension, winLength, outputFolder)
+    result, distance = solver.solve()
+    print(f"{dimension} X {dimension}, k = {winLength}: {RESULT_NAMES[result]} for the first player in {distance} moves "
+          f"({sum(solver.getLayerSizes())} grids, {time.perf_counter() - start:.1f} s)")
@@ -0,0 +1,91 @@
+class SearchStatistics:
+    '''
+        The cost of one search of an engine: how much of the tree it reviewed, how the reviewed part was reduced and
+        how long it took.
+
+        Visited nodes: The states that the search reviewed (for MonteCarloTreeSearch, the iterations) \n
+        Evaluated leaves: The states whose value was calculated by the evaluation method (or by a playout) \n
+        Cache hits: The states whose value was taken from the transposition table instead of being searched \n
+        Cutoffs: The states whose remaining child-states were skipped due to alpha-beta pruning \n
+        Pruned nodes: The child-states that the cutoffs skipped (together with their whole subtrees) \n
+        First move cutoffs: The cutoffs that the first child-state caused, which measure how good the move ordering is \n
+        Maximum depth: The largest number of moves between the prototype state and a reviewed state \n
+        Completed depth: The depth of the deepest search that finished (iterative deepening may be interrupted) \n
+        Wall time: The seconds that the search took \n
+        Node limit reached: Whether the search stopped early because it visited as many nodes as it was allowed to
+    '''
+    def __init__(self, visitedNodes: int = 0, evaluatedLeaves: int = 0, cacheHits: int = 0, cutoffs: int = 0, prunedNodes: int = 0,
+                 maximumDepth: int = 0, completedDepth: int = 0, wallTime: float = 0, firstMoveCutoffs: int = 0,
+                 nodeLimitReached: bool = False):
+        self.visitedNodes: int = visitedNodes
+        self.evaluatedLeaves: int = evaluatedLeaves
+        self.cacheHits: int = cacheHits
+        self.cutoffs: int = cutoffs
+        self.prunedNodes: int = prunedNodes
+        self.maximumDepth: int = maximumDepth
+        self.completedDepth: int = completedDepth
+        self.wallTime: float = wallTime
+        self.firstMoveCutoffs: int = firstMoveCutoffs
+        self.nodeLimitReached: bool = nodeLimitReached
+
+
+    def getNodesPerSecond(self) -> float:
+        '''
+            Returns how many nodes the search visited per second of wall time
+        '''
+        if (self.wallTime <= 0):
+            return 0
+
+        return self.visitedNodes / self.wallTime
+
+
+    def getFirstMoveCutoffRate(self) -> float:
+        '''
+            Returns the fraction of the cutoffs that the first child-state caused. With a perfect move ordering it is 1
+        '''
+        if (self.cutoffs == 0):
+            return 0
+
+        return self.firstMoveCutoffs / self.cutoffs
+
+
+    def add(self, other: "SearchStatistics") -> None:
+        '''
+            Adds the counters of the {other} search (a part of this one, for example the search of a single move by
+            a worker process) to the counters of this search. The wall time is not added, since the parts may run at
+            the same time.
+        '''
+        self.visitedNodes += other.visitedNodes
+        self.evaluatedLeaves += other.evaluatedLeaves
+        self.cacheHits += other.cacheHits
+        self.cutoffs += other.cutoffs
+        self.prunedNodes += other.prunedNodes
+        self.firstMoveCutoffs += other.firstMoveCutoffs
+        self.maximumDepth = max(self.maximumDepth, other.maximumDepth)
+        self.nodeLimitReached = self.nodeLimitReached or other.nodeLimitReached
+
+
+    def toDictionary(self) -> dict[str, int | float]:
+        '''
+            Returns all the statistics (together with the nodes per second) by name, for logging
+        '''
+        return {
+            "visitedNodes": self.visitedNodes,
+            "evaluatedLeaves": self.evaluatedLeaves,
+            "cacheHits": self.cacheHits,
+            "cutoffs": self.cutoffs,
+            "prunedNodes": self.prunedNodes,
+            "firstMoveCutoffs": self.firstMoveCutoffs,
+            "maximumDepth": self.maximumDepth,
+            "completedDepth": self.completedDepth,
+            "wallTime": self.wallTime,
+            "nodeLimitReached": self.nodeLimitReached,
+            "nodesPerSecond": self.getNodesPerSecond(),
+            "firstMoveCutoffRate": self.getFirstMoveCutoffRate()
+        }
+
+
+    def __str__(self) -> str:
+        return (f"{self.visitedNodes} nodes ({self.evaluatedLeaves} leaves, {self.cacheHits} cache hits, {self.cutoffs} cutoffs, {self.getFirstMoveCutoffRate():.0%} on the first move), "
+                f"depth {self.completedDepth} (max {self.maximumDepth}), {self.wallTime * 1000:.1f} ms, {self.getNodesPerSecond():.0f} nodes/s"
+                f"{', node limit reached' if self.nodeLimitReached else ''}")
@@ -0,0 +1,212 @@
+'''
+    The strong solution of the classic 3 X 3 game, stored as a file of 3 ^ 9 entries of 2 bytes. The entry of a grid is
+    at position 2 * code, where the code of the grid is the number with one base-3 digit per cell (the cell (row, column)
+    is the digit of 3 ^ (row * 3 + column)): 0 for an empty cell, 1 for the first player and 2 for the second player.
+    The first player always starts, so the player to move is the first one when both have placed as many symbols.
+
+    Byte 0: The value of the grid for the player to move, as a signed byte. A win in n moves is 10 - n, a loss in n moves
+        is -(10 - n) and a draw is 0, so faster wins and slower losses are preferred. UNREACHABLE for grids that cannot
+        occur in a game.
+    Byte 1: The cell (row * 3 + column) of the best move, or NO_MOVE if the game has ended.
+
+    Generate the file from the backend folder with:
+        python -m algorithms.tablebase
+'''
+import mmap
+import os
+import sys
+import time
+
+from components.state import State
+from algorithms.searchStatistics import SearchStatistics
+from algorithms.cancellationToken import CancellationToken
+from algorithms.utils import playBestMove
+
+DIMENSION: int = 3
+CELL_COUNT: int = DIMENSION * DIMENSION
+ENTRY_COUNT: int = 3 ** CELL_COUNT
+UNREACHABLE: int = 127
+NO_MOVE: int = 255
+LOSS: int = -10 #the value of a grid where the opponent has just won
+
+DEFAULT_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "tablebase3x3.bin")
+
+_powers: list[int] = [3 ** cell for cell in range(CELL_COUNT)]
+
+
+def encodeState(state: State, players: tuple[str, str]) -> int:
+    '''
+        Returns the base-3 code of the grid of the {state}, where the digit of a cell is 1 for players[0]
+        and 2 for players[1]
+    '''
+    code: int = 0
+    for digit, player in ((1, players[0]), (2, players[1])):
+        board: int = state.getBitboard(player)
+        while (board):
+            lowestBit: int = board & -board
+            code += digit * _powers[lowestBit.bit_length() - 1]
+            board ^= lowestBit
+
+    return code
+
+
+def solveTablebase(players: tuple[str, str] = ("X", "O")) -> bytearray:
+    '''
+        Solves every grid that can occur in a game and returns the entries of the table. The grids are first found
+        layer by layer (all the grids with 0 symbols, with 1 symbol etc) and then solved from the last layer back to
+        the first, so the children of a grid are always solved before it.
+    '''
+    table: bytearray = bytearray([UNREACHABLE, NO_MOVE] * ENTRY_COUNT)
+
+    layers: list[dict[int, State]] = [{0: State(DIMENSION, players)}]
+    for symbols in range(CELL_COUNT):
+        nextLayer: dict[int, State] = {}
+        player: str = players[symbols % 2]
+        for state in layers[-1].values():
+            if (state.isVictory()):
+                continue
+
+            for (row, column) in state.getEmptyCellCoordinates():
+                child: State = state.copy()
+                child.makeMove(player, row, column)
+                nextLayer[encodeState(child, players)] = child
+
+        layers.append(nextLayer)
+
+    for symbols in range(CELL_COUNT, -1, -1):
+        player: str = players[symbols % 2]
+        for code, state in layers[symbols].items():
+            value: int = 0
+            bestMove: int = NO_MOVE
+            if (state.isVictory()):
+                value = LOSS
+            elif (not state.gridIsFull()):
+                value = -128
+                for (row, column) in state.getEmptyCellCoordinates():
+                    cell: int = row * DIMENSION + column
+                    childValue: int = _toSigned(table[2 * (code + (1 if player == players[0] else 2) * _powers[cell])])
+
+                    # The value of the child is for the opponent, and the move makes the end one move further away
+                    moveValue: int = -childValue
+                    moveValue += -1 if moveValue > 0 else (1 if moveValue < 0 else 0)
+                    if (moveValue > value):
+                        value = moveValue
+                        bestMove = cell
+
+            table[2 * code] = value & 0xFF
+            table[2 * code + 1] = bestMove
+
+    return table
+
+
+def writeTablebase(path: str = DEFAULT_PATH) -> None:
+    '''
+        Solves the game and writes the table in the file at the given {path}, reporting the progress
+    '''
+    start: float = time.perf_counter()
+    table: bytearray = solveTablebase()
+    reachable: int = sum(1 for code in range(ENTRY_COUNT) if table[2 * code] != UNREACHABLE)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(table)
+
+    print(f"Solved {reachable} grids in {time.perf_counter() - start:.2f} s, value of the empty grid: {_toSigned(table[0])}")
+    print(f"Wrote {len(table)} bytes in {os.path.normpath(path)}")
+
+
+def _toSigned(byte: int) -> int:
+    '''
+        Returns the value of a byte of the table as a signed number
+    '''
+    return byte - 256 if byte > 127 else byte
+
+
+class Tablebase:
+    '''
+        An engine that plays the classic 3 X 3 game perfectly, by reading the best move of the grid from the solved table
+        (see solveTablebase). The file is memory-mapped instead of loaded, so every process that uses it shares the same
+        pages and a move costs a single lookup. Grids that are not in the table (a different grid size, or a grid that
+        cannot occur in a game where {playerA} starts) are given to the {fallback} engine, if there is one.
+    '''
+    def __init__(self, playerA: str, playerB: str, path: str = DEFAULT_PATH, fallback = None):
+        self.__players: tuple[str, str] = (playerA, playerB)
+        self.__fallback = fallback #an engine with the same findBestMove method, for example MiniMax
+        self.__statistics: SearchStatistics = SearchStatistics() #the statistics of the last call of findBestMove
+
+        with open(path, "rb") as file:
+            self.__table: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+    def miniMax(self, state: State, depth: int, player: str, maxNodes: int | None = None) -> State | None:
+        '''
+            Returns the state after the move that the table gives (see playBestMove). The {depth} is only used by the
+            fallback engine.
+        '''
+        return playBestMove(self, state, depth, player, maxNodes)
+
+
+    def findBestMove(self, state: State, depth: int, player: str, cancellationToken: CancellationToken | None = None,
+                     maxNodes: int | None = None) -> tuple[int, int, int] | None:
+        '''
+            Returns the best move of the {player} in the given {state}, read from the table. A lookup counts as a single
+            node, so the {maxNodes} only limits the fallback engine.
+
+            Returns:
+                tuple[int, int, int] | None: The (row, column) of the cell where the {player} should play, and the value
+                    of the grid (see the description of the table). None if there is no move to make.
+        '''
+        startTime: float = time.perf_counter()
+        entry: tuple[int, int] | None = self.getEntry(state, player)
+        if (entry is None):
+            if (self.__fallback is None):
+                return None
+
+            result: tuple[int, int, int] | None = self.__fallback.findBestMove(state, depth, player, cancellationToken, maxNodes)
+            self.__statistics = self.__fallback.getStatistics()
+            return result
+
+        self.__statistics = SearchStatistics(1, 1, 1, wallTime=time.perf_counter() - startTime)
+        value, bestMove = entry
+        if (bestMove == NO_MOVE):
+            return None
+
+        return (bestMove // DIMENSION, bestMove % DIMENSION, value)
+
+
+    def getEntry(self, state: State, player: str) -> tuple[int, int] | None:
+        '''
+            Returns the value of the {state} for the {player} and the cell of the best move, or None if the state
+            is not in the table or it is not the turn of the {player}
+        '''
+        if (state.dimension != DIMENSION or state.winLength != DIMENSION):
+            return None
+
+        symbols: int = CELL_COUNT - state.getEmptyCellCount()
+        if (player != self.__players[symbols % 2]):
+            return None
+
+        code: int = encodeState(state, self.__players)
+        value: int = _toSigned(self.__table[2 * code])
+        if (value == UNREACHABLE):
+            return None
+
+        return (value, self.__table[2 * code + 1])
+
+
+    def getStatistics(self) -> SearchStatistics:
+        '''
+            Returns the statistics of the last call of findBestMove (a single lookup, unless the fallback engine searched)
+        '''
+        return self.__statistics
+
+
+    def close(self) -> None:
+        '''
+            Unmaps the file of the table
+        '''
+        self.__table.close()
+
+
+if (__name__ == "__main__"):
+    writeTablebase(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH)
@@ -0,0 +1,98 @@
+from enum import Enum
+
+from components.state import State
+from components.boardMasks import BoardMasks, getBoardMasks
+from algorithms.utils import findOpponent
+
+
+class TacticType(Enum):
+    '''
+        Win: The player completes a line and wins at once.
+        Block: The opponent would complete a line with his next move, so the player must occupy that cell.
+        Fork: The player creates two lines that miss a single cell each, and the opponent can block only one of them.
+    '''
+    WIN = 1
+    BLOCK = 2
+    FORK = 3
+
+
+class TacticalCheck:
+    '''
+        Finds the moves that do not need a search, by reading the symbol counters of the lines (see State.getLineCounts).
+        A line is a threat of a player when it contains {winLength} - 1 of his symbols and none of the opponent, since
+        its last empty cell wins the game. The checks are made in order of urgency:
+        1) an immediate win of the player,
+        2) a block of the threat of the opponent (when he has more than one, the game is lost and any of them is blocked),
+        3) a move that creates two threats at once (a fork), which wins since the opponent has no threat of his own.
+        A position without any of them is quiet, and its move is left to the search.
+    '''
+    def __init__(self, players: tuple[str, str]):
+        self.__players: tuple[str, str] = players
+
+
+    def findTacticalMove(self, state: State, player: str) -> tuple[int, int, TacticType] | None:
+        '''
+            Returns the (row, column) of the move that the {player} must make in the given {state} and the tactic that
+            forces it, or None if the position is quiet
+        '''
+        if (state.isVictory() or state.gridIsFull()):
+            return None
+
+        masks: BoardMasks = getBoardMasks(state.dimension, state.winLength)
+        opponent: str = findOpponent(player, self.__players)
+        empty: int = masks.full & ~(state.getBitboard(player) | state.getBitboard(opponent))
+
+        winningCells: int = self.getThreatCells(state, player)
+        if (winningCells):
+            return self.__toMove(masks, winningCells, TacticType.WIN)
+
+        threatCells: int = self.getThreatCells(state, opponent)
+        if (threatCells):
+            return self.__toMove(masks, threatCells, TacticType.BLOCK)
+
+        if (state.winLength < 2):
+            return None
+
+        # A move creates a threat in every line through its cell that already has winLength - 2 symbols of the player
+        # and none of the opponent. The new threats must end in at least two different cells
+        ownCounts: list[int] = state.getLineCounts(player)
+        opponentCounts: list[int] = state.getLineCounts(opponent)
+        target: int = state.winLength - 2
+        cells: int = empty
+        while (cells):
+            bit: int = cells & -cells
+            newThreatCells: int = 0
+            for line in masks.cellLines[bit.bit_length() - 1]:
+                if (ownCounts[line] == target and opponentCounts[line] == 0):
+                    newThreatCells |= masks.lines[line] & empty & ~bit
+
+            if (newThreatCells.bit_count() >= 2):
+                return self.__toMove(masks, bit, TacticType.FORK)
+            cells ^= bit
+
+        return None
+
+
+    def getThreatCells(self, state: State, player: str) -> int:
+        '''
+            Returns the bitmask of the empty cells where the {player} would complete a line and win
+        '''
+        masks: BoardMasks = getBoardMasks(state.dimension, state.winLength)
+        ownCounts: list[int] = state.getLineCounts(player)
+        opponentCounts: list[int] = state.getLineCounts(findOpponent(player, self.__players))
+        target: int = state.winLength - 1
+
+        result: int = 0
+        for line in range(len(masks.lines)):
+            if (ownCounts[line] == target and opponentCounts[line] == 0):
+                result |= masks.lines[line]
+
+        return result & ~(state.getBitboard(self.__players[0]) | state.getBitboard(self.__players[1]))
+
+
+    def __toMove(self, masks: BoardMasks, cells: int, tactic: TacticType) -> tuple[int, int, TacticType]:
+        '''
+            Returns the first (in row-major order) of the given {cells} as a move of the given {tactic}
+        '''
+        row, column = masks.coordinates[(cells & -cells).bit_length() - 1]
+        return (row, column, tactic)
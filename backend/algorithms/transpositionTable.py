@@ -0,0 +1,132 @@
+from enum import Enum
+
+
+class BoundType(Enum):
+    '''
+        Exact: The stored value is the exact minimax value of the state.
+        Lower: The search was cut off, so the real minimax value is greater than or equal to the stored value.
+        Upper: The search was cut off, so the real minimax value is less than or equal to the stored value.
+    '''
+    EXACT = 1
+    LOWER = 2
+    UPPER = 3
+
+
+class ReplacementPolicy(Enum):
+    '''
+        Depth preferred: A stored entry is replaced only by an entry that was searched at least as deep.
+        Always replace: A stored entry is always replaced by the newest entry.
+        Two tier: Every bucket holds a depth-preferred slot and an always-replace slot. An entry that is not
+            deep enough for the first slot is written in the second one.
+    '''
+    DEPTH_PREFERRED = 1
+    ALWAYS_REPLACE = 2
+    TWO_TIER = 3
+
+
+class TranspositionEntry:
+    def __init__(self, key: int, value: int, depth: int, boundType: BoundType, generation: int = 0, 
+                 bestMove: tuple[int, int] | None = None):
+        self.key: int = key
+        self.value: int = value
+        self.depth: int = depth
+        self.boundType: BoundType = boundType
+        self.generation: int = generation #the search that stored the entry (see TranspositionTable.newSearch)
+        self.bestMove: tuple[int, int] | None = bestMove #the move that achieved the value, tried first when the state is searched again
+
+
+class TranspositionTable:
+    '''
+        Stores the minimax values of already reviewed states, so that a state that is reached again through a
+        different order of moves does not need to be searched from scratch. \n
+        The table never holds more than {capacity} entries. The entries are kept in a fixed list of buckets and the
+        bucket of an entry is determined by its key, so when two keys fall in the same bucket, the {replacementPolicy}
+        decides which one is kept. \n
+        The entries survive between the searches of a game, since the position after the reply of the opponent was
+        usually reviewed by the previous search. An entry that was stored by a previous search (an older generation)
+        can always be replaced, so the entries of positions that can no longer occur are slowly overwritten.
+    '''
+    def __init__(self, capacity: int, replacementPolicy: ReplacementPolicy = ReplacementPolicy.DEPTH_PREFERRED):
+        self.__replacementPolicy: ReplacementPolicy = replacementPolicy
+        self.__slotsPerBucket: int = 2 if replacementPolicy == ReplacementPolicy.TWO_TIER else 1
+        self.__bucketCount: int = max(1, capacity // self.__slotsPerBucket)
+        self.__slots: list[TranspositionEntry | None] = []
+        self.__size: int = 0 #the number of occupied slots
+        self.__generation: int = 0 #increased at the start of every search
+
+        self.clear()
+
+
+    def lookup(self, key: int) -> TranspositionEntry | None:
+        '''
+            Returns the entry that was stored with the given {key}, or None if there is no such entry
+        '''
+        index: int = (key % self.__bucketCount) * self.__slotsPerBucket
+        for slot in range(index, index + self.__slotsPerBucket):
+            entry: TranspositionEntry | None = self.__slots[slot]
+            if (entry is not None and entry.key == key):
+                return entry
+
+        return None
+
+
+    def store(self, key: int, value: int, depth: int, boundType: BoundType, bestMove: tuple[int, int] | None = None) -> None:
+        '''
+            Saves the {value} of the state with the given {key}, if the replacement policy allows it.
+
+            Parameters:
+                key (int): The hash of the state (together with anything else the value depends on)
+                value (int): The value that the search found
+                depth (int): How deep below the state the search went
+                boundType (BoundType): Whether the {value} is exact or just a bound of the real minimax value
+                bestMove (tuple[int, int] | None): The (row, column) move that achieved the {value}, if the state has moves
+        '''
+        index: int = (key % self.__bucketCount) * self.__slotsPerBucket
+        newEntry: TranspositionEntry = TranspositionEntry(key, value, depth, boundType, self.__generation, bestMove)
+        current: TranspositionEntry | None = self.__slots[index]
+
+        if (current is None or current.key == key or self.__replacementPolicy == ReplacementPolicy.ALWAYS_REPLACE 
+            or current.generation != self.__generation or depth >= current.depth):
+            self.__writeSlot(index, newEntry)
+
+        elif (self.__replacementPolicy == ReplacementPolicy.TWO_TIER):
+            self.__writeSlot(index + 1, newEntry)
+
+
+    def __writeSlot(self, slot: int, entry: TranspositionEntry) -> None:
+        '''
+            Writes the {entry} in the given {slot}, keeping the number of occupied slots up to date
+        '''
+        if (self.__slots[slot] is None):
+            self.__size += 1
+
+        self.__slots[slot] = entry
+
+
+    def newSearch(self) -> None:
+        '''
+            Marks the start of a new search. The entries that are stored from now on belong to a new generation
+        '''
+        self.__generation += 1
+
+
+    def clear(self) -> None:
+        '''
+            Removes all the entries of the table
+        '''
+        self.__slots = [None] * (self.__bucketCount * self.__slotsPerBucket)
+        self.__size = 0
+
+
+    def getSize(self) -> int:
+        '''
+            Returns the number of entries that are currently stored
+        '''
+        return self.__size
+
+
+    def getCapacity(self) -> int:
+        '''
+            Returns the maximum number of entries that the table can hold
+        '''
+        return self.__bucketCount * self.__slotsPerBucket
@@ -1,5 +1,22 @@
+from components.state import State
+
+
 def findOpponent(player: str, players: tuple[str, str]) -> str:
         '''
             Finds the symbol that the opponent of the given player uses
         '''
-        return players[0] if player == players[1] else players[1]
\ No newline at end of file
+        return players[0] if player == players[1] else players[1]
+
+
+def playBestMove(engine, state: State, depth: int, player: str, maxNodes: int | None = None) -> State | None:
+    '''
+        Returns the state that occurs when the {player} makes the move that the {engine} finds in the given {state}
+        (see MiniMax.findBestMove), or None if there is no move to make. Every engine implements its miniMax with it.
+    '''
+    bestMove: tuple[int, int, int] | None = engine.findBestMove(state, depth, player, maxNodes=maxNodes)
+    if (bestMove is None):
+        return None
+
+    nextState: State = state.copy()
+    nextState.play(player, bestMove[0], bestMove[1])
+    return nextState
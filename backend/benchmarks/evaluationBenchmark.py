@@ -0,0 +1,122 @@
+'''
+    Measures the cost of evaluating one leaf with ThreeTwoOneEvaluation, against the previous way of evaluating it:
+    six separate passes (one for every term of the formula) over the rows, columns and diagonals of the grid, counting 
+    the symbols of both players in every line. Both evaluations are checked to return exactly the same values.
+    If NumPy is installed, the batch evaluation of all the leaves at once (evaluateBatch) is measured and checked too.
+
+    Run it from the backend folder:
+        python -m benchmarks.evaluationBenchmark [number of leaves]
+'''
+import random
+import sys
+import time
+
+from setup import setupBackend
+
+setupBackend()
+
+from components.state import State
+from algorithms.evaluationMethods.threeTwoOneEvaluation import ThreeTwoOneEvaluation, numpy
+
+
+PLAYERS: tuple[str, str] = ("X", "O")
+
+
+def sixPassEvaluate(state: State, currentPlayer: str) -> int:
+    '''
+        The previous evaluation: every term of the formula builds every line of the grid again, and counts 
+        the symbols of both players in it
+    '''
+    opponent: str = PLAYERS[0] if currentPlayer == PLAYERS[1] else PLAYERS[1]
+
+    def countLines(allyTarget: int, opponentTarget: int) -> int:
+        lines: list[list[str]] = [state.getRow(row) for row in range(state.dimension)]
+        lines += [state.getColumn(column) for column in range(state.dimension)]
+        lines += [state.getPrimaryDiagonal(), state.getSecondaryDiagonal()]
+
+        result: int = 0
+        for line in lines:
+            allyAppearances: int = sum(1 for symbol in line if symbol == currentPlayer)
+            opponentAppearances: int = sum(1 for symbol in line if symbol == opponent)
+            if (allyAppearances == allyTarget and opponentAppearances == opponentTarget):
+                result += 1
+
+        return result
+
+    k: int = state.dimension
+    X3, X2, X1 = countLines(k, 0), countLines(k - 1, 0), countLines(k - 2, 0)
+    Y3, Y2, Y1 = countLines(0, k), countLines(0, k - 1), countLines(0, k - 2)
+
+    return 10 * X3 + 3 * X2 + X1 - (10 * Y3 + 3 * Y2 + Y1)
+
+
+def randomLeaves(dimension: int, count: int) -> list[State]:
+    '''
+        Creates {count} states of a {dimension} X {dimension} grid by playing a random number of random moves
+    '''
+    leaves: list[State] = []
+    for i in range(count):
+        state: State = State(dimension, PLAYERS)
+        cells: list[tuple[int, int]] = state.getEmptyCellCoordinates()
+        random.shuffle(cells)
+        for move, (row, column) in enumerate(cells[:random.randint(0, len(cells))]):
+            state.makeMove(PLAYERS[move % 2], row, column)
+            if (state.isVictory()):
+                break
+        leaves.append(state)
+
+    return leaves
+
+
+def timePerLeaf(evaluate, leaves: list[State]) -> float:
+    '''
+        Returns the average microseconds that {evaluate} needs for one of the {leaves}
+    '''
+    start: float = time.perf_counter()
+    for leaf in leaves:
+        evaluate(leaf, PLAYERS[0])
+    return (time.perf_counter() - start) / len(leaves) * 1000000
+
+
+def toGrids(leaves: list[State]) -> "numpy.ndarray":
+    '''
+        Returns the (M, N, N) int8 array that evaluateBatch expects for the given {leaves}
+    '''
+    codes: dict[str, int] = {PLAYERS[0]: 1, PLAYERS[1]: -1, " ": 0}
+    dimension: int = leaves[0].dimension
+    return numpy.array(
+        [[[codes[leaf.getCellSymbol(row, column)] for column in range(dimension)] for row in range(dimension)] for leaf in leaves],
+        dtype=numpy.int8
+    )
+
+
+if (__name__ == "__main__"):
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    random.seed(0)
+    evaluation: ThreeTwoOneEvaluation = ThreeTwoOneEvaluation(PLAYERS)
+
+    for dimension in (3, 4, 5):
+        leaves: list[State] = randomLeaves(dimension, count)
+
+        for leaf in leaves:
+            for player in PLAYERS:
+                if (evaluation.evaluate(leaf, player) != sixPassEvaluate(leaf, player)):
+                    raise AssertionError("The single-pass evaluation differs from the six-pass evaluation")
+
+        sixPass: float = timePerLeaf(sixPassEvaluate, leaves)
+        singlePass: float = timePerLeaf(evaluation.evaluate, leaves)
+
+        print(f"{dimension} X {dimension} grid, {count} leaves (same values):")
+        print(f"    six passes over the lines:   {sixPass:.2f} us per leaf")
+        print(f"    one table lookup per line:   {singlePass:.2f} us per leaf ({sixPass / singlePass:.1f}x faster)")
+
+        if (numpy is not None):
+            grids: numpy.ndarray = toGrids(leaves)
+            start: float = time.perf_counter()
+            values: numpy.ndarray = evaluation.evaluateBatch(grids, PLAYERS[0])
+            batch: float = (time.perf_counter() - start) / len(leaves) * 1000000
+
+            if (values.tolist() != [evaluation.evaluate(leaf, PLAYERS[0]) for leaf in leaves]):
+                raise AssertionError("The batch evaluation differs from the evaluation of one leaf at a time")
+
+            print(f"    one batch for all leaves:    {batch:.2f} us per leaf ({sixPass / batch:.1f}x faster)")
@@ -0,0 +1,97 @@
+'''
+    Compares alpha-beta searches that try the moves in row-major order against searches that sort them with the
+    move ordering (see MoveOrdering). Both searches of a position must find the same minimax value. The history of the
+    move ordering is kept from position to position, as it is during a game. The parallel search with move ordering
+    must also choose the same moves as the serial one.
+
+    Run it from the backend folder:
+        python -m benchmarks.moveOrderingBenchmark [positions per grid]
+'''
+import random
+import sys
+
+from setup import setupBackend
+
+setupBackend()
+
+from components.state import State
+from algorithms.miniMax import MiniMax
+from algorithms.searchStatistics import SearchStatistics
+
+
+PLAYERS: tuple[str, str] = ("X", "O")
+
+# The grids (dimension, win length) and the depth that their positions are searched
+GRIDS: list[tuple[int, int, int]] = [(3, 3, 9), (4, 3, 6), (4, 4, 6), (5, 4, 4)]
+
+
+def randomPositions(dimension: int, winLength: int, count: int) -> list[tuple[State, str]]:
+    '''
+        Creates {count} positions of a game that has not ended, with up to a third of the grid filled by random moves,
+        together with the player who plays next
+    '''
+    positions: list[tuple[State, str]] = []
+    while (len(positions) < count):
+        state: State = State(dimension, PLAYERS, winLength)
+        cells: list[tuple[int, int]] = state.getEmptyCellCoordinates()
+        random.shuffle(cells)
+        moves: int = random.randint(0, len(cells) // 3)
+        for move, (row, column) in enumerate(cells[:moves]):
+            state.makeMove(PLAYERS[move % 2], row, column)
+
+        if (not state.isVictory()):
+            positions.append((state, PLAYERS[moves % 2]))
+
+    return positions
+
+
+def searchAll(engine: MiniMax, positions: list[tuple[State, str]], depth: int) -> tuple[list[int], SearchStatistics]:
+    '''
+        Searches every position with the {engine} and returns the minimax values, together with the sum of the statistics
+    '''
+    values: list[int] = []
+    total: SearchStatistics = SearchStatistics()
+    for state, player in positions:
+        values.append(engine.findBestMove(state, depth, player)[2])
+        total.add(engine.getStatistics())
+        total.wallTime += engine.getStatistics().wallTime
+
+    return (values, total)
+
+
+def compareParallel(positions: list[tuple[State, str]], depth: int, configuration: dict) -> None:
+    '''
+        Searches every position with a serial and a parallel engine of the given {configuration} (the arguments of
+        MiniMax) and raises AssertionError if they choose different moves
+    '''
+    serial: MiniMax = MiniMax(*PLAYERS, **configuration)
+    parallel: MiniMax = MiniMax(*PLAYERS, parallelWorkers=2, **configuration)
+    for state, player in positions:
+        serialMove: tuple[int, int, int] = serial.findBestMove(state, depth, player)
+        parallelMove: tuple[int, int, int] = parallel.findBestMove(state, depth, player)
+        if (serialMove != parallelMove):
+            raise AssertionError(f"The parallel search chose {parallelMove} instead of {serialMove} with {configuration}")
+
+
+if (__name__ == "__main__"):
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    random.seed(0)
+
+    for dimension, winLength, depth in GRIDS:
+        positions: list[tuple[State, str]] = randomPositions(dimension, winLength, count)
+        plainValues, plain = searchAll(MiniMax(*PLAYERS, alphaBeta=True, transpositionTableSize=100000), positions, depth)
+        orderedValues, ordered = searchAll(MiniMax(*PLAYERS, alphaBeta=True, transpositionTableSize=100000, moveOrdering=True),
+                                           positions, depth)
+
+        if (plainValues != orderedValues):
+            raise AssertionError("The search with move ordering found different minimax values")
+
+        print(f"{dimension} X {dimension} grid, k = {winLength}, depth {depth}, {count} positions (same values):")
+        print(f"    row-major order: {plain.visitedNodes:9} nodes, {plain.getFirstMoveCutoffRate():4.0%} first-move cutoffs, {plain.wallTime:6.2f} s")
+        print(f"    move ordering:   {ordered.visitedNodes:9} nodes, {ordered.getFirstMoveCutoffRate():4.0%} first-move cutoffs, {ordered.wallTime:6.2f} s"
+              f" ({plain.visitedNodes / ordered.visitedNodes:.1f}x fewer nodes)")
+
+        compareParallel(positions, depth, {"alphaBeta": True, "moveOrdering": True})
+        compareParallel(positions, depth, {"alphaBeta": True, "moveOrdering": True, "transpositionTableSize": 100000,
+                                           "useSymmetry": True})
+        print("    parallel search with move ordering: same moves")
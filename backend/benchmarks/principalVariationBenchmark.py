@@ -0,0 +1,74 @@
+'''
+    Compares the nodes that three engines visit in order to find the minimax value of the same positions: MiniMax with
+    alpha-beta pruning (moves in row-major order, a single search), MiniMax as the game uses it (alpha-beta pruning,
+    move ordering and iterative deepening, with a deadline that is never reached), and the principal variation search
+    with aspiration windows (see PrincipalVariationSearch), which also deepens one level at a time. All of them must
+    find the same values.
+
+    Run it from the backend folder:
+        python -m benchmarks.principalVariationBenchmark [positions per grid]
+'''
+import random
+import sys
+
+from setup import setupBackend
+
+setupBackend()
+
+from components.state import State
+from algorithms.miniMax import MiniMax
+from algorithms.principalVariationSearch import PrincipalVariationSearch
+from algorithms.searchStatistics import SearchStatistics
+from benchmarks.moveOrderingBenchmark import randomPositions
+
+
+PLAYERS: tuple[str, str] = ("X", "O")
+TABLE_SIZE: int = 200000
+NO_DEADLINE: int = 1000000000 #milliseconds, so the iterative deepening of MiniMax always reaches the full depth
+
+# The grids (dimension, win length) and the depth that their positions are searched
+GRIDS: list[tuple[int, int, int]] = [(4, 3, 7), (4, 4, 7), (5, 4, 5), (5, 5, 6)]
+
+
+def searchAll(engine, positions: list[tuple[State, str]], depth: int) -> tuple[list[int], SearchStatistics]:
+    '''
+        Searches every position with the {engine} and returns the minimax values, together with the sum of the statistics
+    '''
+    values: list[int] = []
+    total: SearchStatistics = SearchStatistics()
+    for state, player in positions:
+        values.append(engine.findBestMove(state, depth, player)[2])
+        total.add(engine.getStatistics())
+        total.wallTime += engine.getStatistics().wallTime
+
+    return (values, total)
+
+
+if (__name__ == "__main__"):
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    random.seed(0)
+
+    for dimension, winLength, depth in GRIDS:
+        positions: list[tuple[State, str]] = randomPositions(dimension, winLength, count)
+        engines: list[tuple[str, object]] = [
+            ("alpha-beta:", MiniMax(*PLAYERS, alphaBeta=True, transpositionTableSize=TABLE_SIZE)),
+            ("alpha-beta, ordering, deepening:", MiniMax(*PLAYERS, alphaBeta=True, transpositionTableSize=TABLE_SIZE,
+                                                        moveOrdering=True, moveDeadline=NO_DEADLINE)),
+            ("principal variation, aspiration:", PrincipalVariationSearch(*PLAYERS, transpositionTableSize=TABLE_SIZE))
+        ]
+
+        print(f"{dimension} X {dimension} grid, k = {winLength}, depth {depth}, {count} positions (same values):")
+        plainValues: list[int] = []
+        nodes: list[int] = []
+        for name, engine in engines:
+            values, statistics = searchAll(engine, positions, depth)
+            if (len(plainValues) == 0):
+                plainValues = values
+            elif (values != plainValues):
+                raise AssertionError(f"{name} found different minimax values")
+
+            nodes.append(statistics.visitedNodes)
+            comparison: str = " ".join(f"{previous / statistics.visitedNodes:5.2f}x" for previous in nodes[:-1])
+            print(f"    {name:33} {statistics.visitedNodes:9} nodes, {statistics.wallTime:6.2f} s  {comparison}")
+
+        print("    (the last columns: how many times fewer nodes than every engine above)")
@@ -0,0 +1,82 @@
+'''
+    Compares the two ways of walking the tree of the game: creating a new child State for every move (getChildStates)
+    and making/taking back the moves on a single State (makeMove/undoMove). Both walks visit exactly the same nodes.
+
+    Run it from the backend folder:
+        python -m benchmarks.stateBenchmark [depth]
+'''
+import sys
+import time
+import tracemalloc
+
+from setup import setupBackend
+
+setupBackend()
+
+from components.state import State
+from algorithms.utils import findOpponent
+
+
+PLAYERS: tuple[str, str] = ("X", "O")
+
+
+def walkWithCopies(state: State, depth: int, player: str, counters: dict[str, int]) -> None:
+    '''
+        Visits every state down to {depth} levels, creating a new State for every child
+    '''
+    counters["nodes"] += 1
+    if (depth == 0 or state.isVictory() or state.gridIsFull()):
+        return
+
+    childStates: list[State] = state.getChildStates(player)
+    counters["allocatedStates"] += len(childStates)
+    for child in childStates:
+        walkWithCopies(child, depth - 1, findOpponent(player, PLAYERS), counters)
+
+
+def walkWithMakeUndo(state: State, depth: int, player: str, counters: dict[str, int]) -> None:
+    '''
+        Visits every state down to {depth} levels, making and taking back the moves on the given {state}
+    '''
+    counters["nodes"] += 1
+    if (depth == 0 or state.isVictory() or state.gridIsFull()):
+        return
+
+    for (row, column) in state.getEmptyCellCoordinates():
+        state.makeMove(player, row, column)
+        walkWithMakeUndo(state, depth - 1, findOpponent(player, PLAYERS), counters)
+        state.undoMove(row, column)
+
+
+def measure(name: str, walk, depth: int) -> None:
+    '''
+        Runs the {walk} from the empty 3 X 3 grid and prints its node count, speed and memory usage
+    '''
+    counters: dict[str, int] = {"nodes": 0, "allocatedStates": 0}
+
+    tracemalloc.start()
+    start: float = time.perf_counter()
+    walk(State(3, PLAYERS), depth, PLAYERS[0], counters)
+    elapsed: float = time.perf_counter() - start
+    peakMemory: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # tracemalloc slows the walk down, so the speed is measured again without it
+    speedCounters: dict[str, int] = {"nodes": 0, "allocatedStates": 0}
+    start = time.perf_counter()
+    walk(State(3, PLAYERS), depth, PLAYERS[0], speedCounters)
+    untracedElapsed: float = time.perf_counter() - start
+
+    print(f"{name}:")
+    print(f"    nodes visited:     {counters['nodes']}")
+    print(f"    states allocated:  {counters['allocatedStates']}")
+    print(f"    peak memory:       {peakMemory / 1024:.1f} KiB (traced run: {elapsed:.2f} s)")
+    print(f"    time:              {untracedElapsed:.2f} s")
+    print(f"    nodes per second:  {speedCounters['nodes'] / untracedElapsed:,.0f}")
+
+
+if (__name__ == "__main__"):
+    depth: int = int(sys.argv[1]) if len(sys.argv) > 1 else 9
+
+    measure("Copying child states (getChildStates)", walkWithCopies, depth)
+    measure("Single state (makeMove / undoMove)", walkWithMakeUndo, depth)
@@ -0,0 +1,86 @@
+'''
+    Measures the time of the tactical check (see TacticalCheck) on random positions, and checks the moves that it
+    answers without a search. On the 3 X 3 grid, which is searched to the end, a tactical move must keep the minimax
+    value of the position. On every grid, MiniMax must play the tactical move and report it as a search of depth 1.
+
+    Run it from the backend folder:
+        python -m benchmarks.tacticalCheckBenchmark [positions per grid]
+'''
+import random
+import sys
+import time
+
+from setup import setupBackend
+
+setupBackend()
+
+from components.state import State
+from algorithms.miniMax import MiniMax
+from algorithms.searchStatistics import SearchStatistics
+from algorithms.tacticalCheck import TacticalCheck, TacticType
+from algorithms.utils import findOpponent
+from benchmarks.moveOrderingBenchmark import randomPositions
+
+
+PLAYERS: tuple[str, str] = ("X", "O")
+
+# The grids (dimension, win length) and the depth that MiniMax searches their positions
+GRIDS: list[tuple[int, int, int]] = [(3, 3, 9), (4, 3, 4), (5, 4, 3), (7, 5, 2)]
+
+
+def checkStatistics(statistics: SearchStatistics) -> None:
+    '''
+        Raises AssertionError if the {statistics} of a tactical move are not the ones of a search of depth 1
+    '''
+    if (statistics.visitedNodes != 1 or statistics.completedDepth != 1 or statistics.maximumDepth != 1):
+        raise AssertionError(f"A tactical move reported {statistics} instead of a search of depth 1")
+
+
+def checkValue(state: State, player: str, move: tuple[int, int]) -> None:
+    '''
+        Raises AssertionError if the {move} of the {player} loses a part of the minimax value of the {state}, according
+        to a full search
+    '''
+    search: MiniMax = MiniMax(*PLAYERS, alphaBeta=True)
+    bestValue: int = search.findBestMove(state, state.getEmptyCellCount(), player)[2]
+
+    nextState: State = state.copy()
+    nextState.makeMove(player, move[0], move[1])
+    if (nextState.isVictory() or nextState.gridIsFull()):
+        return
+
+    # The reply is searched from the point of view of the opponent, so its value is negated
+    replyValue: int = search.findBestMove(nextState, nextState.getEmptyCellCount(), findOpponent(player, PLAYERS))[2]
+    if ((-replyValue > 0) != (bestValue > 0) or (-replyValue < 0) != (bestValue < 0)):
+        raise AssertionError(f"The tactical move {move} changes the result of the position")
+
+
+if (__name__ == "__main__"):
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    random.seed(0)
+    tacticalCheck: TacticalCheck = TacticalCheck(PLAYERS)
+
+    for dimension, winLength, depth in GRIDS:
+        positions: list[tuple[State, str]] = randomPositions(dimension, winLength, count)
+        engine: MiniMax = MiniMax(*PLAYERS, alphaBeta=True, tacticalCheck=True)
+        tactics: dict[TacticType, int] = {tactic: 0 for tactic in TacticType}
+        elapsed: float = 0
+
+        for state, player in positions:
+            start: float = time.perf_counter()
+            tacticalMove: tuple[int, int, TacticType] | None = tacticalCheck.findTacticalMove(state, player)
+            elapsed += time.perf_counter() - start
+            if (tacticalMove is None):
+                continue
+
+            tactics[tacticalMove[2]] += 1
+            if (engine.findBestMove(state, depth, player)[:2] != tacticalMove[:2]):
+                raise AssertionError(f"MiniMax did not play the tactical move {tacticalMove}")
+            checkStatistics(engine.getStatistics())
+
+            if (dimension == 3):
+                checkValue(state, player, tacticalMove[:2])
+
+        found: str = ", ".join(f"{tactics[tactic]} {tactic.name.lower()}" for tactic in TacticType)
+        print(f"{dimension} X {dimension} grid, k = {winLength}, {count} positions: {found}, "
+              f"{elapsed / count * 1000000:.1f} us per check")
@@ -0,0 +1,108 @@
+from components.symmetry import getSymmetricCellOrders
+
+class BoardMasks:
+    '''
+        The bitmasks that the states of a {dimension} X {dimension} grid use, when a player needs {winLength} 
+        consecutive symbols in order to win. The cell (row, column) of the grid is represented by the bit at 
+        position row * dimension + column.
+
+        The lines of the grid are all the horizontal, vertical and diagonal segments of {winLength} cells. When 
+        {winLength} is equal to {dimension}, they are the rows, the columns and the two diagonals of the grid.
+    '''
+    def __init__(self, dimension: int, winLength: int):
+        self.dimension: int = dimension
+        self.winLength: int = winLength
+        self.cellCount: int = dimension * dimension
+        self.full: int = (1 << self.cellCount) - 1 #all the cells of the grid
+        self.coordinates: list[tuple[int, int]] = [divmod(index, dimension) for index in range(self.cellCount)] #the (row, column) of every bit
+
+        self.lines: list[int] = []
+        self.rowLines: list[list[int]] = [[] for row in range(dimension)] #the positions (in self.lines) of the lines of every row
+        self.columnLines: list[list[int]] = [[] for column in range(dimension)] #the positions of the lines of every column
+        self.primaryDiagonalLines: list[int] = [] #the positions of the lines that lie on the primary diagonal
+        self.secondaryDiagonalLines: list[int] = [] #the positions of the lines that lie on the secondary diagonal
+
+        last: int = dimension - winLength # the last row/column where a line can start
+        for row in range(dimension):
+            for start in range(last + 1):
+                self.rowLines[row].append(self.__addLine([(row, start + x) for x in range(winLength)]))
+
+        for column in range(dimension):
+            for start in range(last + 1):
+                self.columnLines[column].append(self.__addLine([(start + x, column) for x in range(winLength)]))
+
+        for row in range(last + 1):
+            for column in range(last + 1):
+                line: int = self.__addLine([(row + x, column + x) for x in range(winLength)])
+                if (row == column):
+                    self.primaryDiagonalLines.append(line)
+
+        for row in range(last + 1):
+            for column in range(winLength - 1, dimension):
+                line: int = self.__addLine([(row + x, column - x) for x in range(winLength)])
+                if (row + column == dimension - 1):
+                    self.secondaryDiagonalLines.append(line)
+
+        # For every cell, the positions (in self.lines) of the lines that pass through it
+        self.cellLines: list[list[int]] = [
+            [line for line in range(len(self.lines)) if self.lines[line] & (1 << index)] for index in range(self.cellCount)
+        ]
+
+        # For every symmetry of the grid, the position that every bit moves to when the grid is transformed
+        self.symmetries: list[list[int]] = []
+        for cellOrder in getSymmetricCellOrders(dimension):
+            permutation: list[int] = [0] * self.cellCount
+            for target, (row, column) in enumerate(cellOrder):
+                permutation[row * dimension + column] = target
+            self.symmetries.append(permutation)
+
+        # For every symmetry, the position that every bit of the transformed grid comes from
+        self.inverseSymmetries: list[list[int]] = []
+        for permutation in self.symmetries:
+            inverse: list[int] = [0] * self.cellCount
+            for cell, target in enumerate(permutation):
+                inverse[target] = cell
+            self.inverseSymmetries.append(inverse)
+
+        # For every symmetry, the transformed bits of every byte of a board: symmetryBytes[symmetry][byte][value] is
+        # the board that the bits {value} at position 8 * byte move to. A board is transformed with one lookup per byte
+        self.symmetryBytes: list[list[list[int]]] = []
+        byteCount: int = (self.cellCount + 7) // 8
+        for permutation in self.symmetries:
+            tables: list[list[int]] = []
+            for byte in range(byteCount):
+                table: list[int] = [0] * 256
+                for value in range(1, 256):
+                    lowestBit: int = value & -value
+                    cell: int = 8 * byte + lowestBit.bit_length() - 1
+                    transformed: int = (1 << permutation[cell]) if cell < self.cellCount else 0
+                    table[value] = table[value ^ lowestBit] | transformed
+                tables.append(table)
+            self.symmetryBytes.append(tables)
+
+
+    def __addLine(self, cells: list[tuple[int, int]]) -> int:
+        '''
+            Adds a line with the given {cells} in self.lines and returns its position
+        '''
+        mask: int = 0
+        for (row, column) in cells:
+            mask |= 1 << (row * self.dimension + column)
+
+        self.lines.append(mask)
+        return len(self.lines) - 1
+
+
+# The masks of every (dimension, winLength) requested so far. They are shared by all the states of the same grid
+_boardMasks: dict[tuple[int, int], BoardMasks] = {}
+
+
+def getBoardMasks(dimension: int, winLength: int) -> BoardMasks:
+    '''
+        Returns the bitmasks of a {dimension} X {dimension} grid with the given {winLength}, building them 
+        the first time they are requested
+    '''
+    if ((dimension, winLength) not in _boardMasks):
+        _boardMasks[(dimension, winLength)] = BoardMasks(dimension, winLength)
+
+    return _boardMasks[(dimension, winLength)]
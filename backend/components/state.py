@@ -1,22 +1,100 @@
 from __future__ import annotations
 
+from components.zobrist import getGridKeys
+from components.boardMasks import BoardMasks, getBoardMasks
+
 class State():
-    def __init__(self, dimension: int):
+    '''
+        A snapshot of the tic-tac-toe grid. The grid is stored as two bitmasks, one for each player, where the bit 
+        at position row * dimension + column is set if the player has placed his symbol in the cell (row, column).
+        Moves, victory checks and empty cell searches are bit operations against the precomputed masks of the lines.
+
+        A player wins by placing {winLength} symbols in a row, column or diagonal (by default, as many as the {dimension}).
+        The state counts how many symbols of each player every line of {winLength} cells contains (see BoardMasks.lines).
+        A move only updates the counters of the lines that pass through its cell, so victory checks and evaluations 
+        read the counters instead of scanning the grid.
+    '''
+    __slots__ = ("dimension", "winLength", "__players", "__masks", "__zobristKeys", "__boardA", "__boardB", "__zobristHash", "__canonicalForm",
+                 "__canonicalSymmetry", "__lineCountsA", "__lineCountsB", "__completedLines")
+
+    def __init__(self, dimension: int, players: tuple[str, str] = ("X", "O"), winLength: int | None = None):
         self.dimension = dimension
-        self.__createGrid()
-
-    def __createGrid(self) -> None:
-        '''
-            Creates a self.dimension X self.dimension grid and fills its cells with ' '
-        '''
-        self.__grid: list[list[str]] = [[' ' for j in range(self.dimension)] for i in range(self.dimension)]
+        self.winLength: int = winLength if winLength is not None else dimension
+        self.__players: tuple[str, str] = players
+        self.__masks: BoardMasks = getBoardMasks(dimension, self.winLength)
+        self.__zobristKeys: tuple[list[int], list[int]] = (getGridKeys(dimension, players[0]), getGridKeys(dimension, players[1]))
+        self.__boardA: int = 0 #the cells that contain the symbol of players[0]
+        self.__boardB: int = 0 #the cells that contain the symbol of players[1]
+        self.__zobristHash: int = 0 #the XOR of the zobrist keys of all occupied cells, updated on every move
+        self.__canonicalForm: int | None = None #calculated when it is first requested, forgotten on every move
+        self.__canonicalSymmetry: int = 0 #the symmetry (see BoardMasks.symmetries) that gives the canonical form
+        self.__lineCountsA: list[int] = [0] * len(self.__masks.lines) #the symbols of players[0] in every line (see BoardMasks.lines)
+        self.__lineCountsB: list[int] = [0] * len(self.__masks.lines) #the symbols of players[1] in every line
+        self.__completedLines: int = 0 #the lines that are full of the symbols of a single player
 
 
-    def assignGrid(self, grid: list[list[str]]):
-        '''
-            Assign a copy of the grid that gets as parameter to self.__grid
+    def assignGrid(self, grid: list[list[str]], zobristHash: int | None = None):
         '''
-        self.__grid = [[grid[row][column] for column in range(self.dimension)] for row in range(self.dimension)]
+            Replaces the symbols of the state with the symbols of the given {grid}
+
+            Parameters:
+                zobristHash (int | None): The zobrist hash of the given {grid}, if it is already known. Otherwise
+                    it is calculated from scratch
+        '''
+        self.__boardA = 0
+        self.__boardB = 0
+        self.__zobristHash = 0
+        self.__lineCountsA = [0] * len(self.__masks.lines)
+        self.__lineCountsB = [0] * len(self.__masks.lines)
+        self.__completedLines = 0
+        for row in range(self.dimension):
+            for column in range(self.dimension):
+                self.__placeSymbol(row, column, grid[row][column])
+
+        if (zobristHash is not None):
+            self.__zobristHash = zobristHash
+        self.__canonicalForm = None
+
+
+    def assignBitboards(self, boardA: int, boardB: int) -> None:
+        '''
+            Replaces the symbols of the state with the cells of the given bitmasks, {boardA} for the first player and 
+            {boardB} for the second player (see getBitboard)
+        '''
+        self.__boardA = 0
+        self.__boardB = 0
+        self.__zobristHash = 0
+        self.__lineCountsA = [0] * len(self.__masks.lines)
+        self.__lineCountsB = [0] * len(self.__masks.lines)
+        self.__completedLines = 0
+        for symbol, board in ((self.__players[0], boardA), (self.__players[1], boardB)):
+            while (board):
+                lowestBit: int = board & -board
+                self.makeMove(symbol, *self.__masks.coordinates[lowestBit.bit_length() - 1])
+                board ^= lowestBit
+
+        self.__canonicalForm = None
+
+
+    def copy(self) -> State:
+        '''
+            Returns a new state with the same symbols in the same cells
+        '''
+        result: State = State.__new__(State)
+        result.dimension = self.dimension
+        result.winLength = self.winLength
+        result.__players = self.__players
+        result.__masks = self.__masks
+        result.__zobristKeys = self.__zobristKeys
+        result.__boardA = self.__boardA
+        result.__boardB = self.__boardB
+        result.__zobristHash = self.__zobristHash
+        result.__canonicalForm = self.__canonicalForm
+        result.__canonicalSymmetry = self.__canonicalSymmetry
+        result.__lineCountsA = self.__lineCountsA[:]
+        result.__lineCountsB = self.__lineCountsB[:]
+        result.__completedLines = self.__completedLines
+        return result
 
 
     def printGrid(self) -> None:
@@ -57,11 +135,11 @@ class State():
 
             # Print the symbol of the cell, and a '|' column seperator after
             for j in range(self.dimension - 1):
-                print(self.__grid[i][j], end='')
+                print(self.__getSymbol(i, j), end='')
                 print("|", end='')
 
             # Print last symbol of the row
-            print(self.__grid[i][self.dimension - 1], end='')
+            print(self.__getSymbol(i, self.dimension - 1), end='')
 
             # Print right edge part ('|')
             print('|')
@@ -79,9 +157,9 @@ class State():
         print(' ', end='')
         print('|', end='') 
         for j in range(self.dimension - 1):
-            print(self.__grid[self.dimension - 1][j], end='')
+            print(self.__getSymbol(self.dimension - 1, j), end='')
             print("|", end='')
-        print(self.__grid[self.dimension - 1][self.dimension - 1], end='')
+        print(self.__getSymbol(self.dimension - 1, self.dimension - 1), end='')
         print('|')
 
         # Print bottom edge ('-------')
@@ -101,90 +179,140 @@ class State():
                 column (int): The column of the grid that contains the cell where the symbol is going to be placed
         '''
         
-        self.__grid[row][column] = symbol
-    
+        self.__placeSymbol(row, column, symbol)
 
-    def isVictory(self) -> bool:
+
+    def makeMove(self, symbol: str, row: int, column: int) -> None:
         '''
-            Checks if one of the 2 players has won the game
+            Places the {symbol} of a player in the empty cell ({row}, {column}), changing this state instead of creating 
+            a new one. It is meant for walking the tree of the game on a single state, so neither the coordinates 
+            nor the cell are checked. The move is taken back with undoMove.
         '''
-        for i in range(self.dimension):
-            if (self.checkRow(i)):
-                return True
+        index: int = row * self.dimension + column
+        if (symbol == self.__players[0]):
+            self.__boardA |= 1 << index
+            self.__zobristHash ^= self.__zobristKeys[0][index]
+            lineCounts: list[int] = self.__lineCountsA
+        else:
+            self.__boardB |= 1 << index
+            self.__zobristHash ^= self.__zobristKeys[1][index]
+            lineCounts: list[int] = self.__lineCountsB
+
+        for line in self.__masks.cellLines[index]:
+            lineCounts[line] += 1
+            if (lineCounts[line] == self.winLength):
+                self.__completedLines += 1
+
+        self.__canonicalForm = None
+
+
+    def undoMove(self, row: int, column: int) -> None:
+        '''
+            Takes back the move that was made with makeMove in the cell ({row}, {column}), emptying the cell again
+        '''
+        index: int = row * self.dimension + column
+        bit: int = 1 << index
+        if (self.__boardA & bit):
+            self.__boardA ^= bit
+            self.__zobristHash ^= self.__zobristKeys[0][index]
+            lineCounts: list[int] = self.__lineCountsA
+        else:
+            self.__boardB ^= bit
+            self.__zobristHash ^= self.__zobristKeys[1][index]
+            lineCounts: list[int] = self.__lineCountsB
+
+        for line in self.__masks.cellLines[index]:
+            if (lineCounts[line] == self.winLength):
+                self.__completedLines -= 1
+            lineCounts[line] -= 1
+
+        self.__canonicalForm = None
+
+
+    def __placeSymbol(self, row: int, column: int, symbol: str) -> None:
+        '''
+            Writes the {symbol} (or ' ' to empty the cell) in the cell ({row}, {column}), removing the symbol that 
+            was previously in the cell
+        '''
+        if (symbol != ' ' and symbol not in self.__players):
+            print(f"Symbol '{symbol}' does not belong to any player!")
+            return None
+
+        if (self.__getSymbol(row, column) != ' '):
+            self.undoMove(row, column)
+
+        if (symbol != ' '):
+            self.makeMove(symbol, row, column)
+
 
-        for j in range(self.dimension):
-            if (self.checkColumn(j)):
+    def __getSymbol(self, row: int, column: int) -> str:
+        '''
+            Returns the symbol in the cell ({row}, {column}), without checking the coordinates
+        '''
+        bit: int = 1 << (row * self.dimension + column)
+        if (self.__boardA & bit):
+            return self.__players[0]
+        if (self.__boardB & bit):
+            return self.__players[1]
+        return ' '
+    
+
+    def __containsCompletedLine(self, lines: list[int]) -> bool:
+        '''
+            Checks if any of the given {lines} (positions in BoardMasks.lines) is full of the symbols of a single player
+        '''
+        for line in lines:
+            if (self.__lineCountsA[line] == self.winLength or self.__lineCountsB[line] == self.winLength):
                 return True
 
-        if (self.checkPrimaryDiagonal()):
-            return True
+        return False
+    
 
-        if (self.checkSecondaryDiagonal()):
-            return True
+    def isVictory(self) -> bool:
+        '''
+            Checks if one of the 2 players has won the game
+        '''
+        return self.__completedLines > 0
 
 
     def checkRow(self, row: int) -> bool: 
         '''
-            Checks if the row at index {row} wins the game (contains 3 consecutive same symbols)
+            Checks if the row at index {row} wins the game (contains {winLength} consecutive same symbols)
 
             Returns: 
                 bool: True for victory, False otherwise
         '''
-        match: bool = self.__grid[row][0] != " "
-        j: int = 0
-        while (match and j < self.dimension - 1):
-            match = self.__grid[row][j] == self.__grid[row][j + 1]
-            j += 1
-
-        return match 
+        return self.__containsCompletedLine(self.__masks.rowLines[row])
 
 
     def checkColumn(self, column: int) -> bool: 
         '''
-            Checks if the column at index {column} wins the game (contains 3 consecutive same symbols)
+            Checks if the column at index {column} wins the game (contains {winLength} consecutive same symbols)
 
             Returns: 
                 bool: True for victory, False otherwise
         '''
-        match: bool = self.__grid[0][column] != " "
-        i: int = 0
-        while (match and i < self.dimension - 1):
-            match = self.__grid[i][column] == self.__grid[i + 1][column]
-            i += 1
-
-        return match 
+        return self.__containsCompletedLine(self.__masks.columnLines[column])
 
 
     def checkPrimaryDiagonal(self) -> bool:
         '''
-            Checks if the primary diagonal wins the game (contains 3 consecutive same symbols
+            Checks if the primary diagonal wins the game (contains {winLength} consecutive same symbols)
 
             Returns: 
                 bool: True for victory, False otherwise
         '''
-        match: bool = self.__grid[0][0] != " "
-        x: int = 0
-        while (match and x < self.dimension - 1):
-            match = self.__grid[x][x] == self.__grid[x + 1][x + 1]
-            x += 1
-
-        return match
+        return self.__containsCompletedLine(self.__masks.primaryDiagonalLines)
 
     
     def checkSecondaryDiagonal(self) -> bool:
         '''
-            Checks if the secondary diagonal wins the game (contains 3 consecutive same symbols).
+            Checks if the secondary diagonal wins the game (contains {winLength} consecutive same symbols).
             
             Returns: 
                 bool: True for victory, False otherwise
         '''
-        match: bool = self.__grid[0][self.dimension - 1] != " "
-        x: int = self.dimension - 1
-        while (match and x > 0):
-            match = self.__grid[x][self.dimension - 1 - x] == self.__grid[x - 1][self.dimension - x]
-            x -= 1
-
-        return match
+        return self.__containsCompletedLine(self.__masks.secondaryDiagonalLines)
 
     
     def gridIsFull(self) -> bool:
@@ -194,12 +322,7 @@ class State():
             Returns:
                 bool: True if grid is full, False otherwise
         '''
-        for row in self.__grid:
-            for cell in row:
-                if cell == ' ':
-                    return False
-
-        return True
+        return (self.__boardA | self.__boardB) == self.__masks.full
     
 
     def getRow(self, row: int) -> list[str]:
@@ -209,7 +332,7 @@ class State():
         '''
         if (row < 0 or row >= self.dimension):
             return []
-        return self.__grid[row]
+        return [self.__getSymbol(row, j) for j in range(self.dimension)]
     
     
     def getColumn(self, column: int) -> list[str]:
@@ -219,7 +342,7 @@ class State():
         '''
         if (column < 0 or column >= self.dimension):
             return []
-        return [self.__grid[j][column] for j in range(self.dimension)]
+        return [self.__getSymbol(j, column) for j in range(self.dimension)]
     
     
     def getPrimaryDiagonal(self) -> list[str]:
@@ -227,7 +350,7 @@ class State():
             Returns a list with the elements of the primary diagonal of the grid,
             ie the elements [0][0], [1][1] etc
         '''
-        return [self.__grid[x][x] for x in range(self.dimension)]
+        return [self.__getSymbol(x, x) for x in range(self.dimension)]
     
 
     def getSecondaryDiagonal(self) -> list[str]:
@@ -235,7 +358,7 @@ class State():
             Returns a list with the elements of the secondary diagonal of the grid,
             ie the elements [2][0], [1][1] etc (for self.dimension = 3)
         '''
-        return [self.__grid[self.dimension - 1 - x][x] for x in range(self.dimension)]
+        return [self.__getSymbol(self.dimension - 1 - x, x) for x in range(self.dimension)]
     
     
     def getChildStates(self, symbol: str) -> list[State]:
@@ -251,12 +374,11 @@ class State():
         '''
         result: list[State] = []
 
-        emptyCellCoordinates: list[tuple[int, int]] = self.__getEmptyCellCoordinates()
+        emptyCellCoordinates: list[tuple[int, int]] = self.getEmptyCellCoordinates()
         for coordinates in emptyCellCoordinates:
-            child: State = State(self.dimension)
-            child.assignGrid(self.__grid)
+            child: State = self.copy()
 
-            child.setCellSymbol(coordinates[0], coordinates[1], symbol)
+            child.play(symbol, coordinates[0], coordinates[1])
 
             result.append(child)
 
@@ -264,19 +386,27 @@ class State():
 
     
             
-    def __getEmptyCellCoordinates(self) -> list[tuple[int, int]]:
+    def getEmptyCellCoordinates(self) -> list[tuple[int, int]]:
         '''
-            Finds and returns a list with (row, column) coordinates where grid[row][column] is empty
+            Finds and returns a list with (row, column) coordinates of the empty cells, in row-major order
         '''
         result: list[tuple[int, int]] = []
-        for row in range(self.dimension):
-            for column in range(self.dimension):
-                if (self.__grid[row][column] == ' '):
-                    result.append((row, column))
+        empty: int = self.__masks.full & ~(self.__boardA | self.__boardB)
+        while (empty):
+            lowestBit: int = empty & -empty
+            result.append(self.__masks.coordinates[lowestBit.bit_length() - 1])
+            empty ^= lowestBit
 
         return result
     
 
+    def getEmptyCellCount(self) -> int:
+        '''
+            Returns the number of empty cells of the grid
+        '''
+        return self.__masks.cellCount - (self.__boardA | self.__boardB).bit_count()
+    
+
     def getCellSymbol(self, row: int, column: int) -> str:
         '''
             Returns the symbol that is contained inside grid, at the given {row}, {column} coordinates.
@@ -286,7 +416,7 @@ class State():
             print(f"Coordinates ({row},{column}) are out of limit!")
             return None
         
-        return self.__grid[row][column]
+        return self.__getSymbol(row, column)
     
 
     def setCellSymbol(self, row: int, column: int, symbol: str) -> None:
@@ -298,7 +428,78 @@ class State():
             print(f"Coordinates ({row},{column}) are out of limit!")
             return None
         
-        self.__grid[row][column] = symbol
+        self.__placeSymbol(row, column, symbol)
+    
+
+    def getLineCounts(self, symbol: str) -> list[int]:
+        '''
+            Returns how many times the {symbol} appears in every line of {winLength} cells (see BoardMasks.lines). 
+            When {winLength} is equal to the dimension, the lines are the rows, the columns, the primary diagonal and 
+            the secondary diagonal, in this order. The returned list is the counter of the state itself, 
+            so it must not be changed.
+        '''
+        return self.__lineCountsA if symbol == self.__players[0] else self.__lineCountsB
+    
+
+    def getBitboard(self, symbol: str) -> int:
+        '''
+            Returns the bitmask of the cells that contain the {symbol}. The bit at position row * dimension + column 
+            stands for the cell (row, column).
+        '''
+        return self.__boardA if symbol == self.__players[0] else self.__boardB
+    
+
+    def getZobristHash(self) -> int:
+        '''
+            Returns the zobrist hash of the grid. Two states with the same symbols in the same cells have the same hash.
+        '''
+        return self.__zobristHash
+    
+
+    def getCanonicalForm(self) -> int:
+        '''
+            Returns a number that is the same for all the states that are rotations or reflections of each other. 
+            The grid is encoded once for each of its 8 symmetries, as the bits of the first player followed by the bits
+            of the second player, and the lowest encoding is returned.
+
+            For example, a 3 X 3 grid with a single 'X' in any of its 4 corners has the canonical form 1 (only the bit 
+            of the top-left corner is set).
+        '''
+        if (self.__canonicalForm is None):
+            result: int | None = None
+            for symmetry, tables in enumerate(self.__masks.symmetryBytes):
+                encoding: int = self.__transformBoard(self.__boardA, tables) | (self.__transformBoard(self.__boardB, tables) << self.__masks.cellCount)
+                if (result is None or encoding < result):
+                    result = encoding
+                    self.__canonicalSymmetry = symmetry
+
+            self.__canonicalForm = result
+
+        return self.__canonicalForm
+
+
+    def getCanonicalSymmetry(self) -> int:
+        '''
+            Returns the position (in BoardMasks.symmetries) of the symmetry that transforms the grid to its canonical
+            form (see getCanonicalForm). If more than one does, the first of them is returned.
+        '''
+        self.getCanonicalForm()
+        return self.__canonicalSymmetry
+    
+
+    def __transformBoard(self, board: int, tables: list[list[int]]) -> int:
+        '''
+            Moves every set bit of the {board} to the position that a symmetry specifies, one byte at a time, using
+            the {tables} of the symmetry (see BoardMasks.symmetryBytes)
+        '''
+        result: int = 0
+        for table in tables:
+            if (board == 0):
+                break
+            result |= table[board & 0xFF]
+            board >>= 8
+
+        return result
     
 
     def cellIsEmpty(self, row: int, column: int) -> bool:
@@ -309,4 +510,4 @@ class State():
         if (symbol == None):
             return None
         
-        return symbol == ' '
\ No newline at end of file
+        return symbol == ' '
@@ -0,0 +1,32 @@
+# The cell orders of the 8 symmetries (rotations and reflections) of a square grid, for every dimension requested so far
+_symmetricCellOrders: dict[int, list[list[tuple[int, int]]]] = {}
+
+
+def getSymmetricCellOrders(dimension: int) -> list[list[tuple[int, int]]]:
+    '''
+        Returns the 8 symmetries of a {dimension} X {dimension} grid (identity, 3 rotations and 4 reflections). 
+        Every symmetry is a list with the coordinates of the cells of the grid, in the order that they have to be read 
+        (row by row) in order to get the transformed grid.
+
+        For example, reading the cells in the order [(2, 0), (1, 0), (0, 0), (2, 1), ...] gives the grid rotated 
+        clockwise by 90 degrees (for dimension = 3).
+    '''
+    if (dimension not in _symmetricCellOrders):
+        last: int = dimension - 1
+        transformations = [
+            lambda row, column: (row, column),                # identity
+            lambda row, column: (last - column, row),         # rotation by 90 degrees
+            lambda row, column: (last - row, last - column),  # rotation by 180 degrees
+            lambda row, column: (column, last - row),         # rotation by 270 degrees
+            lambda row, column: (row, last - column),         # horizontal reflection
+            lambda row, column: (last - row, column),         # vertical reflection
+            lambda row, column: (column, row),                # reflection over the primary diagonal
+            lambda row, column: (last - column, last - row),  # reflection over the secondary diagonal
+        ]
+
+        _symmetricCellOrders[dimension] = [
+            [transformation(row, column) for row in range(dimension) for column in range(dimension)]
+            for transformation in transformations
+        ]
+
+    return _symmetricCellOrders[dimension]
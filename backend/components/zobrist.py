@@ -0,0 +1,44 @@
+import random
+
+# The random keys are derived from their own description (instead of a shared random generator), so every process
+# produces exactly the same keys regardless of the order in which they are requested
+_cellKeys: dict[tuple[int, int, str], int] = {}
+_playerKeys: dict[str, int] = {}
+
+
+def getCellKey(row: int, column: int, symbol: str) -> int:
+    '''
+        Returns the 64-bit random number that represents the given {symbol} placed in the cell ({row}, {column}).
+        The Zobrist hash of a grid is the XOR of the keys of all its occupied cells.
+    '''
+    key: tuple[int, int, str] = (row, column, symbol)
+    if (key not in _cellKeys):
+        _cellKeys[key] = random.Random(f"cell:{row}:{column}:{symbol}").getrandbits(64)
+
+    return _cellKeys[key]
+
+
+def getPlayerKey(symbol: str) -> int:
+    '''
+        Returns the 64-bit random number that represents that the player who uses the given {symbol} is 
+        the one who is going to play
+    '''
+    if (symbol not in _playerKeys):
+        _playerKeys[symbol] = random.Random(f"player:{symbol}").getrandbits(64)
+
+    return _playerKeys[symbol]
+
+
+# The keys of every cell of a grid for a symbol, listed by the position of the cell (row * dimension + column)
+_gridKeys: dict[tuple[int, str], list[int]] = {}
+
+
+def getGridKeys(dimension: int, symbol: str) -> list[int]:
+    '''
+        Returns the keys of the {symbol} for all the cells of a {dimension} X {dimension} grid. The key of the cell
+        (row, column) is at position row * dimension + column and it is equal to getCellKey(row, column, symbol).
+    '''
+    if ((dimension, symbol) not in _gridKeys):
+        _gridKeys[(dimension, symbol)] = [getCellKey(row, column, symbol) for row in range(dimension) for column in range(dimension)]
+
+    return _gridKeys[(dimension, symbol)]
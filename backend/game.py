@@ -1,40 +1,72 @@
-from typing import Dict, List, Tuple
+from typing import Tuple
+import os
 
 from components.state import State
 from algorithms.miniMax import MiniMax
+from algorithms.tablebase import Tablebase, DEFAULT_PATH
+from algorithms.searchStatistics import SearchStatistics
+from algorithms.cancellationToken import CancellationToken, SearchCancelled
 
 class PlayerMoveResponse:
-    def __init__(self, successful: bool, message: str, gameHasEnded: bool = False):
+    def __init__(self, successful: bool, message: str, gameHasEnded: bool = False, statistics: SearchStatistics | None = None):
         self.successful: bool = successful
         self.gameHasEnded: bool = gameHasEnded
         self.message: str = message
+        self.statistics: SearchStatistics | None = statistics #the cost of the search, if the computer made the move
 
 class Game:
-    def __init__(self):
-        self.__dimension: int = 3
+    def __init__(self, dimension: int = 3, winLength: int | None = None):
+        self.__dimension: int = dimension #the number of rows and columns of the grid
+        # How many consecutive symbols a player needs in order to win. By default, a whole row, column or diagonal
+        self.__winLength: int = winLength if winLength is not None else dimension
         self.__playerA: str = "X"
         self.__playerB: str = "O"  
         self.__currentPlayer: str = self.__playerA
         self.__computerIsPlaying: bool = False
-        self.__miniMax: MiniMax = MiniMax(self.__playerA, self.__playerB)
-        self.__state = State(self.__dimension)
+        self.__searchDepth: int = 8 #the maximum depth that the algorithm searches
+        self.__moveDeadline: int = 2000 #the milliseconds that the algorithm is allowed to search for each move
+        self.__miniMax: MiniMax = MiniMax(self.__playerA, self.__playerB, alphaBeta=True, transpositionTableSize=200000, useSymmetry=True,
+                                          moveDeadline=self.__moveDeadline, trackPrincipalVariation=True, tacticalCheck=True,
+                                          moveOrdering=True)
+        self.__state = State(self.__dimension, (self.__playerA, self.__playerB), self.__winLength)
+
+        # The classic 3 X 3 game is solved (see algorithms/tablebase.py), so if the file of the solution exists, the moves 
+        # are read from it. The algorithm is still used for any state that the table does not contain
+        self.__tablebase: Tablebase | None = None
+        if (self.__dimension == 3 and self.__winLength == 3 and os.path.exists(DEFAULT_PATH)):
+            self.__tablebase = Tablebase(self.__playerA, self.__playerB, DEFAULT_PATH, self.__miniMax)
+        self.__engine: Tablebase | MiniMax = self.__tablebase if self.__tablebase is not None else self.__miniMax
+
+        # The moves of the computer that were found while the human was thinking (see ponder), together with the
+        # statistics of their searches, by the zobrist hash of the state after the reply of the human
+        self.__ponderedMoves: dict[int, Tuple[Tuple[int, int, int], SearchStatistics]] = {}
+        self.__expectedReply: tuple[int, int] | None = None #the reply of the human that the last search expects
+
+    def close(self) -> None:
+        '''
+            Stops the processes that the engine keeps between the moves (see MiniMax.close). It must be called when
+            the game is no longer needed.
+        '''
+        self.__miniMax.close()
+
 
     def newTerminalGame(self):
         '''
             Starts a new Tic-Tac-toe game in terminal.
         '''
-        self.__state = State(self.__dimension)
+        self.__state = State(self.__dimension, (self.__playerA, self.__playerB), self.__winLength)
+        self.__miniMax.clearTranspositionTable()
+        self.__miniMax.clearMoveHistory()
+        self.__ponderedMoves = {}
         while (not (self.__state.isVictory() or self.__state.gridIsFull())):
             self.__state.printGrid()
             print("")
 
             if (self.__computerIsPlaying):
-                nextState: State = self.__miniMax.miniMax(self.__state, 8, self.__currentPlayer)
+                bestMove: Tuple[int, int, int] | None = self.__engine.findBestMove(self.__state, self.__searchDepth, self.__currentPlayer)
 
-                stateDifference: Dict[str, List[Tuple[int, int, str]]] = self.findDifferencesBetweenStates(self.__state, nextState)
-
-                if (self.__stateDifferenceIsValid(stateDifference)):
-                    coordinates: tuple[int, int] = (stateDifference["plus"][0][0], stateDifference["plus"][0][1])
+                if (bestMove is not None):
+                    coordinates: tuple[int, int] = (bestMove[0], bestMove[1])
                     self.__state.play(self.__currentPlayer, coordinates[0], coordinates[1])
                     print(f"Computer placed {self.__currentPlayer} in (row, column) = ({coordinates[0]},{coordinates[1]})")
                 else:
@@ -66,32 +98,84 @@ class Game:
             print("The game results to tie!")
 
 
-    def computerRequestsToPlayFromFrontend(self) -> PlayerMoveResponse:
+    def computerRequestsToPlayFromFrontend(self, cancellationToken: CancellationToken | None = None) -> PlayerMoveResponse:
         '''
             The frontend requests algorithm to make its move based on the current state of the game (frontend).
+            If the move was already found while the human was thinking (see ponder), it is played without a new search.
+            If the {cancellationToken} is cancelled during the search, the computer does not play and the game goes on.
         '''
-        nextState: State = self.__miniMax.miniMax(self.__state, 8, self.__currentPlayer)
+        bestMove: Tuple[int, int, int] | None = None
+        statistics: SearchStatistics | None = None
+        if (self.__state.getZobristHash() in self.__ponderedMoves):
+            bestMove, statistics = self.__ponderedMoves[self.__state.getZobristHash()]
+            self.__expectedReply = None
+        else:
+            try:
+                bestMove = self.__engine.findBestMove(self.__state, self.__searchDepth, self.__currentPlayer, cancellationToken)
+            except SearchCancelled:
+                return PlayerMoveResponse(False, "The computer stopped searching.", False, self.__engine.getStatistics())
 
-        stateDifference: Dict[str, List[Tuple[int, int, str]]] = self.findDifferencesBetweenStates(self.__state, nextState)
+            statistics = self.__engine.getStatistics()
 
-        if (self.__stateDifferenceIsValid(stateDifference)):
-            coordinates: tuple[int, int] = (stateDifference["plus"][0][0], stateDifference["plus"][0][1])
+            self.__expectedReply = None
+            if (self.__engine is self.__miniMax):
+                principalVariation: list[tuple[int, int]] = self.__miniMax.getPrincipalVariation()
+                self.__expectedReply = principalVariation[1] if len(principalVariation) > 1 else None
+
+        self.__ponderedMoves = {}
+
+        if (bestMove is not None):
+            coordinates: tuple[int, int] = (bestMove[0], bestMove[1])
             self.__state.play(self.__currentPlayer, coordinates[0], coordinates[1])
 
             symbol: str = self.__currentPlayer
             self.__switchTurn()
 
             if (self.__state.isVictory()):
-                return PlayerMoveResponse(True, f"Game ended, player {symbol} won!", True)
+                return PlayerMoveResponse(True, f"Game ended, player {symbol} won!", True, statistics)
             elif (self.__state.gridIsFull()):
-                return PlayerMoveResponse(True, f"Game ended, the result is tie!", True)
-            return PlayerMoveResponse(True, f"Computer placed {symbol} in (row, column) = ({coordinates[0]}, {coordinates[1]})", False)
+                return PlayerMoveResponse(True, f"Game ended, the result is tie!", True, statistics)
+            return PlayerMoveResponse(True, f"Computer placed {symbol} in (row, column) = ({coordinates[0]}, {coordinates[1]})", False, statistics)
         
         else:
-            return PlayerMoveResponse(False, "Something is wrong with the algorithm :(", True)
+            return PlayerMoveResponse(False, "Something is wrong with the algorithm :(", True, statistics)
 
 
 
+    def ponder(self, state: State, human: str, cancellationToken: CancellationToken) -> None:
+        '''
+            Searches the move of the computer for every reply that the {human} can make in the given {state}, starting 
+            with the reply that the last search of the computer expects. The {state} must be a copy (see getPosition)
+            taken before the thread starts, since the human may play while the pondering runs. It is meant to run in a background thread 
+            while the human thinks, so that computerRequestsToPlayFromFrontend can answer at once. Even when the actual
+            reply was not reached, its search starts with the transposition table that these searches filled.
+
+            The pondering stops within a few nodes when the {cancellationToken} is cancelled. The caller must wait 
+            for it before the computer plays. When the moves are read from the solved table, there is nothing to ponder.
+        '''
+        if (self.__tablebase is not None):
+            return
+
+        computer: str = self.__playerB if human == self.__playerA else self.__playerA
+
+        replies: list[tuple[int, int]] = state.getEmptyCellCoordinates()
+        if (self.__expectedReply in replies):
+            replies.remove(self.__expectedReply)
+            replies.insert(0, self.__expectedReply)
+
+        for reply in replies:
+            state.makeMove(human, reply[0], reply[1])
+            if (not (state.isVictory() or state.gridIsFull())):
+                try:
+                    bestMove: Tuple[int, int, int] | None = self.__miniMax.findBestMove(state, self.__searchDepth, computer, cancellationToken)
+                except SearchCancelled:
+                    return
+
+                if (bestMove is not None):
+                    self.__ponderedMoves[state.getZobristHash()] = (bestMove, self.__miniMax.getStatistics())
+            state.undoMove(reply[0], reply[1])
+
+
     def humanRequestsToPlayFromFrontend(self, coordinates: Tuple[int, int]) -> PlayerMoveResponse:
         '''
             Performs the move of the player who is currently playing, in the given {coordinates}. \n
@@ -167,67 +251,13 @@ class Game:
     
 
 
-    def findDifferencesBetweenStates(self, stateA: State, stateB: State) -> Dict[str, List[Tuple[int, int, str]]]:
+    def getPosition(self) -> tuple[State, str]:
         '''
-            Finds the differences between 2 states. There can be 3 types of differences:
-            a) plus: A symbol exists in stateB at certain cell, but the same cell in stateA is empty
-            b) minus: A symbol exists in stateA at certain cell, but the same cell in stateB is empty
-            c) diff: The same cell contains different symbols in the two states
-
-            Returns:
-                Dict[str, List[Tuple[int, int, str]]]: A dictionary with 3 key-value pairs. The key is one of the 3 difference types,
-                    and the value is a list of tuples. Each tuple contains 3 items. The first 2 are the coordinates of the cell, and 
-                    the last is the symbol that is different.
-
-                For example:
-                    {
-                        'plus': [(2, 1, 'O')], 
-                        'minus': [(1, 1, 'O')], 
-                        'diff': [(0, 0, 'O'), (0, 2, 'X')]
-                    }
-
-                    means:
-
-                    - The stateB has symbol 'O' at coordinates: (row, column) = (2, 1) but the stateA has no symbol at the same cell
-                    - The stateA has symbol 'O' at coordinates: (row, column) = (1, 1) but the stateB has no symbol at the same cell
-                    - The stateB has symbol 'O' at coordinates: (row, column) = (0, 0) but the stateA has symbol 'X' at the same cell
-                    - The stateB has symbol 'X' at coordinates: (row, column) = (0, 2) but the stateA has symbol 'O' at the same cell
-
-
+            Returns a copy of the current state of the game, together with the symbol of the player who plays next
         '''
+        return (self.__state.copy(), self.__currentPlayer)
 
-        result: Dict[str, List[Tuple[int, int, str]]] = {
-            "plus": [],
-            "minus": [],
-            "diff": []
-        }
 
-        for row in range(self.__dimension):
-            for column in range(self.__dimension):
-                stateACellIsEmpty: bool = stateA.cellIsEmpty(row, column)
-                stateBCellIsEmpty: bool = stateB.cellIsEmpty(row, column)
-
-                if (stateACellIsEmpty == True and stateBCellIsEmpty == False):
-                    result["plus"].append((row, column, stateB.getCellSymbol(row, column)))
-                
-                if (stateACellIsEmpty == False and stateBCellIsEmpty == True):
-                    result["minus"].append((row, column, stateA.getCellSymbol(row, column)))
-
-                if ((stateACellIsEmpty == False and stateBCellIsEmpty == False)):
-                    if (stateA.getCellSymbol(row, column) != stateB.getCellSymbol(row, column)):
-                        result["diff"].append((row, column, stateB.getCellSymbol(row, column)))
-
-        return result
-    
-
-    def __stateDifferenceIsValid(self, stateDifference: Dict[str, List[Tuple[int, int, str]]]) -> bool:
-        '''
-            Returns True or False whether the given {stateDifference} object contains only one difference 
-            of type 'plus'
-        '''
-        return len(stateDifference["plus"]) == 1 and len(stateDifference["minus"]) == 0 and len(stateDifference["diff"]) == 0
-    
-    
     def getCellSymbol(self, row: int, column: int) -> str:
         '''
             Returns the symbol in the cell ({row}, {column}) of the current state of the game
@@ -239,30 +269,20 @@ class Game:
         '''
             Checks if the given {row} of the grid performs tic-tac-toe.
         '''
-        match row:
-            case 0:
-                return self.__state.checkRow(0)
-            case 1:
-                return self.__state.checkRow(1)
-            case 2:
-                return self.__state.checkRow(2)
-            case _:
-                return False
+        if (row < 0 or row >= self.__dimension):
+            return False
+        
+        return self.__state.checkRow(row)
             
 
     def checkIfColumnWins(self, column: int) -> bool: 
         '''
             Checks if the given {column} of the grid performs tic-tac-toe.
         '''
-        match column:
-            case 0:
-                return self.__state.checkColumn(0)
-            case 1:
-                return self.__state.checkColumn(1)
-            case 2:
-                return self.__state.checkColumn(2)
-            case _:
-                return False
+        if (column < 0 or column >= self.__dimension):
+            return False
+        
+        return self.__state.checkColumn(column)
             
 
     def checkIfPrimaryDiagonalWins(self) -> bool:
@@ -283,4 +303,8 @@ class Game:
         return self.__dimension
     
 
+    def getWinLength(self) -> int:
+        return self.__winLength
+    
+
     
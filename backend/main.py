@@ -11,6 +11,7 @@ from game import Game
 game: Game = Game()
 
 game.newTerminalGame()
+game.close()
 
 
 
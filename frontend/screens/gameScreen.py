@@ -21,7 +21,7 @@ class GameScreen(GeneralScreen):
         self.__cellHeight: int = self._height // self._dimension
         self.__informerPanelMessage: str = "Your symbol is X. Play wherether you want."
 
-        self.__middleman: Middleman = Middleman() # The interface between frontend and backend
+        self.__middleman: Middleman = Middleman(pondering=True) # The interface between frontend and backend
         self.__thread: threading.Thread | None = None
 
         self._defineStyleVariables()
@@ -160,6 +160,10 @@ class GameScreen(GeneralScreen):
 
         '''
         for event in events:
+            if (event.type == pygame.QUIT):
+                # Stop the searches and the processes of the computer, so that they do not keep the program alive
+                self.__middleman.close()
+
             if (event.type == pygame.MOUSEBUTTONDOWN):
                 if (not pygame.mouse.get_pressed()[0]): continue
                 x, y = pygame.mouse.get_pos()
@@ -177,7 +181,15 @@ class GameScreen(GeneralScreen):
                         self.__thread = threading.Thread(target=self.__requestComputerMoveWithDelay)
                         self.__thread.start()
         
-        self.__backToMenuButton.handleEvents(events, callBackForNavigation)
+        self.__backToMenuButton.handleEvents(events, lambda screen: self.__leaveGame(screen, callBackForNavigation))
+
+
+    def __leaveGame(self, screen, callBackForNavigation) -> None:
+        '''
+            Stops the searches and the processes of the computer, since the game is left, and navigates to the given {screen}
+        '''
+        self.__middleman.close()
+        callBackForNavigation(screen)
 
 
     def __requestComputerMoveWithDelay(self):
@@ -1,7 +1,11 @@
 from typing import Tuple
 from enum import Enum
+import threading
 
 from backend.game import Game, PlayerMoveResponse
+from backend.components.state import State
+from backend.algorithms.searchStatistics import SearchStatistics
+from backend.algorithms.cancellationToken import CancellationToken
 
 class GameStatus(Enum):
     '''
@@ -19,11 +23,24 @@ class CurrentPlayer(Enum):
 
 
 class Middleman:
-    def __init__(self):
-        self.__game: Game = Game()
+    def __init__(self, dimension: int = 3, winLength: int | None = None, pondering: bool = False):
+        self.__game: Game = Game(dimension, winLength)
         self.gameStatus: GameStatus = GameStatus(GameStatus.RUNNING)
         self.currentPlayer: CurrentPlayer = CurrentPlayer(CurrentPlayer.HUMAN)
 
+        # If True, the computer searches its next move in a background thread while the human is thinking (see Game.ponder)
+        self.__pondering: bool = pondering
+        self.__ponderThread: threading.Thread | None = None
+        self.__ponderingToken: CancellationToken = CancellationToken()
+        # Held while the pondering thread is started or stopped, so cancelSearches cannot run between the check of
+        # the search token and the start of a new thread
+        self.__ponderLock: threading.Lock = threading.Lock()
+
+        # Stops the search of the move of the computer that is running (see cancelSearches)
+        self.__searchToken: CancellationToken = CancellationToken()
+
+        self.__lastSearchStatistics: SearchStatistics | None = None #the cost of the last move of the computer
+
 
     def humanWillPlay(self, coordinates: Tuple[int, int]) -> str:
         '''
@@ -70,15 +87,22 @@ class Middleman:
 
         if (self.currentPlayer == CurrentPlayer.COMPUTER and self.gameStatus.name == "RUNNING"):
             self.gameStatus = GameStatus.IDLE
-            response: PlayerMoveResponse = self.__game.computerRequestsToPlayFromFrontend()
+            self.stopPondering()
+            response: PlayerMoveResponse = self.__game.computerRequestsToPlayFromFrontend(self.__searchToken)
+            self.__lastSearchStatistics = response.statistics
 
             self.gameStatus = GameStatus.RUNNING
 
             if (response.successful):
+                # The position to ponder is taken before the human is allowed to play, so the pondering thread never
+                # reads the state of the game while it changes
+                state, human = self.__game.getPosition()
                 self.currentPlayer = CurrentPlayer.HUMAN
 
             if (response.gameHasEnded):
                 self.gameStatus = GameStatus.ENDED
+            elif (response.successful):
+                self.__startPondering(state, human)
 
             return response.message
         
@@ -87,6 +111,66 @@ class Middleman:
         
 
 
+    def __startPondering(self, state: State, human: str) -> None:
+        '''
+            Starts searching the next move of the computer in a background thread, if pondering is enabled. The {state}
+            is a copy of the current state of the game, where the {human} plays next.
+        '''
+        with self.__ponderLock:
+            if (not self.__pondering or self.__searchToken.isCancelled()):
+                return
+
+            self.__ponderingToken = CancellationToken()
+            self.__ponderThread = threading.Thread(target=self.__game.ponder, args=(state, human, self.__ponderingToken), daemon=True)
+            self.__ponderThread.start()
+
+
+    def stopPondering(self) -> None:
+        '''
+            Stops the background search of the next move of the computer (if it is running) and waits for it to end
+        '''
+        with self.__ponderLock:
+            self.__stopPondering()
+
+
+    def __stopPondering(self) -> None:
+        '''
+            Stops the pondering thread, while the lock of the pondering is held
+        '''
+        if (self.__ponderThread is not None):
+            self.__ponderingToken.cancel()
+            self.__ponderThread.join()
+            self.__ponderThread = None
+
+
+    def cancelSearches(self) -> None:
+        '''
+            Stops every search of the computer, the one for its move (if it is running) and the pondering, for example
+            because the window closes or the game is left. The computer does not search again in this game.
+        '''
+        with self.__ponderLock:
+            self.__searchToken.cancel()
+            self.__stopPondering()
+
+
+    def close(self) -> None:
+        '''
+            Stops every search of the computer (see cancelSearches) and the processes of its engine, for example
+            because the window closes or the game is left. The middleman cannot be used afterwards.
+        '''
+        self.cancelSearches()
+        self.__game.close()
+
+
+    def getLastSearchStatistics(self) -> SearchStatistics | None:
+        '''
+            Returns the statistics (nodes, leaves, cache hits, cutoffs, depth and time) of the search that found the last
+            move of the computer. If the move was found while the human was thinking, they are the statistics of that 
+            search. None if the computer has not played yet.
+        '''
+        return self.__lastSearchStatistics
+
+
     def getCellSymbol(self, row: int, column: int) -> str:
         '''
             Requests from the game object to access the cell in coordinates ({row}, {column}) in order
@@ -103,13 +187,7 @@ class Middleman:
         if (row < 0 or row >= self.__game.getDimension()):
             return False
 
-        match row:
-            case 0:
-                return self.__game.checkIfRowWins(0)
-            case 1:
-                return self.__game.checkIfRowWins(1)
-            case 2:
-                return self.__game.checkIfRowWins(2)
+        return self.__game.checkIfRowWins(row)
             
 
     def checkIfColumnWins(self, column: int) -> bool: 
@@ -119,13 +197,7 @@ class Middleman:
         if (column < 0 or column >= self.__game.getDimension()):
             return False
 
-        match column:
-            case 0:
-                return self.__game.checkIfColumnWins(0)
-            case 1:
-                return self.__game.checkIfColumnWins(1)
-            case 2:
-                return self.__game.checkIfColumnWins(2)
+        return self.__game.checkIfColumnWins(column)
             
 
     def checkIfPrimaryDiagonalWins(self) -> bool:
@@ -140,4 +212,17 @@ class Middleman:
             Checks if the secondary diagonal of the grid of the current game performs tic-tac-toe.
         '''
         return self.__game.checkIfSecondaryDiagonalWins()
-    
\ No newline at end of file
+    
+
+    def getDimension(self) -> int:
+        '''
+            Returns the number of rows and columns of the grid of the current game
+        '''
+        return self.__game.getDimension()
+    
+
+    def getWinLength(self) -> int:
+        '''
+            Returns how many consecutive symbols a player needs in order to win the current game
+        '''
+        return self.__game.getWinLength()